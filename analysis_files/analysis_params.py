@@ -0,0 +1,39 @@
+import argparse
+import json
+import os
+
+from precision_kernels import COMPUTE_DTYPES, check_compute_dtype
+
+# Parameters shared by the analysis scripts and incremental_build.py. Values in
+# analysis_params.json override these defaults.
+DEFAULT_PARAMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis_params.json')
+DEFAULT_PARAMS = {
+    "near": 0.1,  # 10cm
+    "far_values": [50.0, 100.0, 200.0, 1000.0],
+    "ssao_max": 10.0,  # SSAO mostly cares about first 10m
+    "samples": 1000,
+    "dtype": "float64",  # "float32" halves memory traffic; see precision_kernels.validate_float32
+}
+
+# Defaults overlaid with the parameter file (if it exists)
+def load_params(params_file=DEFAULT_PARAMS_FILE):
+    params = dict(DEFAULT_PARAMS)
+    if os.path.exists(params_file):
+        with open(params_file) as f:
+            params.update(json.load(f))
+    return params
+
+# Command line parsing shared by the scripts: --params selects the parameter file,
+# --dtype overrides its compute dtype. Float32 runs are first validated against
+# float64 for the selected planes (precision_kernels.validate_float32).
+def parse_args(description, check_dtype=True):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--params', default=DEFAULT_PARAMS_FILE, help='JSON parameter file')
+    parser.add_argument('--dtype', choices=sorted(COMPUTE_DTYPES), help='Compute dtype')
+    args = parser.parse_args()
+    params = load_params(args.params)
+    if args.dtype is not None:
+        params["dtype"] = args.dtype
+    if check_dtype:
+        check_compute_dtype(params["near"], params["dtype"], *params["far_values"])
+    return params
@@ -2,48 +2,30 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import ScalarFormatter
 
-# 计算R16F的精度步长(相邻可表示值之间的差值)
-def fp16_precision(x):
-    if x == 0:
-        return 2**-24  # 最小的亚规格化数
-    
-    # 找到最接近的2的幂
-    exponent = np.floor(np.log2(x))
-    
-    # 如果x在亚规格化范围内
-    if exponent < -14:
-        return 2**-24
-    
-    # 返回精度步长
-    return 2**(exponent-10)
-
-# 计算R16Unorm的精度步长
-def unorm16_precision(x):
-    return 1/65535.0
+from analysis_params import parse_args
+from plot_decimation import decimate
+from precision_curves import precision_ratio_curve
+from precision_kernels import fp16_precision, resolve_dtype, unorm16_precision
 
 def main():
+    params = parse_args('R16F与R16Unorm精度步长比较')
+    dtype = resolve_dtype(params["dtype"])
     print("计算R16F和R16Unorm精度差异...")
     
     # 生成测试点 - 使用对数尺度覆盖从极小值到1的范围
-    x_values = np.logspace(-8, 0, 1000)  # 从10^-8到10^0的对数刻度
+    x_values = np.logspace(-8, 0, 1000).astype(dtype)  # 从10^-8到10^0的对数刻度
     
     # 计算每个点的精度
-    fp16_precision_values = [fp16_precision(x) for x in x_values]
-    unorm16_precision_values = [unorm16_precision(x) for x in x_values]
+    fp16_precision_values = fp16_precision(x_values, dtype)
+    unorm16_precision_values = unorm16_precision(x_values, dtype)
     
     # 计算精度比率 (Unorm16相对于FP16的比率，>1表示FP16更好)
-    precision_ratio = [unorm/fp for fp, unorm in zip(fp16_precision_values, unorm16_precision_values)]
+    precision_ratio = unorm16_precision_values / fp16_precision_values
     
     # 查找R16F和R16Unorm精度相等的交叉点
-    crossover_indices = [i for i in range(1, len(precision_ratio)) 
-                         if (precision_ratio[i-1] > 1 and precision_ratio[i] < 1) or 
-                            (precision_ratio[i-1] < 1 and precision_ratio[i] > 1)]
-    
-    crossover_points = []
-    for idx in crossover_indices:
-        crossover_points.append(x_values[idx])
+    crossover_points = precision_ratio_curve(float(x_values[0]), float(x_values[-1])).crossings(1.0)
     
-    if crossover_points:
+    if len(crossover_points):
         print(f"精度交叉点: {', '.join([f'{x:.8f}' for x in crossover_points])}")
     
     # 创建图表
@@ -51,8 +33,8 @@ def main():
     
     # 1. 绘制精度图 (对数-对数尺度)
     plt.subplot(3, 1, 1)
-    plt.loglog(x_values, fp16_precision_values, 'b-', label='R16F精度')
-    plt.loglog(x_values, unorm16_precision_values, 'r-', label='R16Unorm精度')
+    plt.loglog(*decimate(x_values, fp16_precision_values, xscale='log', yscale='log'), 'b-', label='R16F精度')
+    plt.loglog(*decimate(x_values, unorm16_precision_values, xscale='log', yscale='log'), 'r-', label='R16Unorm精度')
     plt.grid(True, which="both", ls="-")
     plt.ylabel('精度步长 (越小越好)')
     plt.title('R16F vs R16Unorm 精度步长比较 (对数尺度)')
@@ -60,8 +42,8 @@ def main():
     
     # 2. 绘制精度图 (线性-对数尺度)
     plt.subplot(3, 1, 2)
-    plt.semilogx(x_values, fp16_precision_values, 'b-', label='R16F精度')
-    plt.semilogx(x_values, unorm16_precision_values, 'r-', label='R16Unorm精度')
+    plt.semilogx(*decimate(x_values, fp16_precision_values, xscale='log', yscale='linear'), 'b-', label='R16F精度')
+    plt.semilogx(*decimate(x_values, unorm16_precision_values, xscale='log', yscale='linear'), 'r-', label='R16Unorm精度')
     plt.grid(True, which="both", ls="-")
     plt.ylabel('精度步长 (越小越好)')
     plt.title('R16F vs R16Unorm 精度步长比较 (半对数尺度)')
@@ -69,7 +51,7 @@ def main():
     
     # 3. 绘制比率图
     plt.subplot(3, 1, 3)
-    plt.semilogx(x_values, precision_ratio, 'g-')
+    plt.semilogx(*decimate(x_values, precision_ratio, xscale='log', yscale='linear'), 'g-')
     plt.axhline(y=1, color='k', linestyle='--')
     
     # 标记交叉点
@@ -103,8 +85,8 @@ def main():
     print("-" * 65)
     
     for depth in key_depths:
-        fp_prec = fp16_precision(depth)
-        unorm_prec = unorm16_precision(depth)
+        fp_prec = float(fp16_precision(depth, dtype))
+        unorm_prec = float(unorm16_precision(depth, dtype))
         ratio = unorm_prec / fp_prec
         better = "R16F" if ratio > 1 else "R16Unorm"
         print(f"{depth:<10.5f} {fp_prec:<15.10f} {unorm_prec:<15.10f} {ratio:<10.2f} {better}")
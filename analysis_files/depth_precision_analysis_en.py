@@ -2,48 +2,30 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import ScalarFormatter
 
-# Calculate precision step for R16F (distance between representable values)
-def fp16_precision(x):
-    if x == 0:
-        return 2**-24  # Smallest subnormal number
-    
-    # Find nearest power of 2
-    exponent = np.floor(np.log2(x))
-    
-    # If x is in subnormal range
-    if exponent < -14:
-        return 2**-24
-    
-    # Return precision step
-    return 2**(exponent-10)
-
-# Calculate precision step for R16Unorm
-def unorm16_precision(x):
-    return 1/65535.0
+from analysis_params import parse_args
+from plot_decimation import decimate
+from precision_curves import precision_ratio_curve
+from precision_kernels import fp16_precision, resolve_dtype, unorm16_precision
 
 def main():
+    params = parse_args('R16F vs R16Unorm precision step comparison')
+    dtype = resolve_dtype(params["dtype"])
     print("Calculating precision difference between R16F and R16Unorm...")
     
     # Generate test points - use logarithmic scale to cover range from tiny values to 1
-    x_values = np.logspace(-8, 0, 1000)  # From 10^-8 to 10^0 on log scale
+    x_values = np.logspace(-8, 0, 1000).astype(dtype)  # From 10^-8 to 10^0 on log scale
     
     # Calculate precision at each point
-    fp16_precision_values = [fp16_precision(x) for x in x_values]
-    unorm16_precision_values = [unorm16_precision(x) for x in x_values]
+    fp16_precision_values = fp16_precision(x_values, dtype)
+    unorm16_precision_values = unorm16_precision(x_values, dtype)
     
     # Calculate precision ratio (Unorm16 relative to FP16, >1 means FP16 is better)
-    precision_ratio = [unorm/fp for fp, unorm in zip(fp16_precision_values, unorm16_precision_values)]
+    precision_ratio = unorm16_precision_values / fp16_precision_values
     
     # Find crossover points where R16F and R16Unorm precision are equal
-    crossover_indices = [i for i in range(1, len(precision_ratio)) 
-                         if (precision_ratio[i-1] > 1 and precision_ratio[i] < 1) or 
-                            (precision_ratio[i-1] < 1 and precision_ratio[i] > 1)]
-    
-    crossover_points = []
-    for idx in crossover_indices:
-        crossover_points.append(x_values[idx])
+    crossover_points = precision_ratio_curve(float(x_values[0]), float(x_values[-1])).crossings(1.0)
     
-    if crossover_points:
+    if len(crossover_points):
         print(f"Precision crossover points: {', '.join([f'{x:.8f}' for x in crossover_points])}")
     
     # Create figure
@@ -51,8 +33,8 @@ def main():
     
     # 1. Plot precision (log-log scale)
     plt.subplot(3, 1, 1)
-    plt.loglog(x_values, fp16_precision_values, 'b-', label='R16F Precision')
-    plt.loglog(x_values, unorm16_precision_values, 'r-', label='R16Unorm Precision')
+    plt.loglog(*decimate(x_values, fp16_precision_values, xscale='log', yscale='log'), 'b-', label='R16F Precision')
+    plt.loglog(*decimate(x_values, unorm16_precision_values, xscale='log', yscale='log'), 'r-', label='R16Unorm Precision')
     plt.grid(True, which="both", ls="-")
     plt.ylabel('Precision Step (smaller is better)')
     plt.title('R16F vs R16Unorm Precision Step Comparison (Log Scale)')
@@ -60,8 +42,8 @@ def main():
     
     # 2. Plot precision (linear-log scale)
     plt.subplot(3, 1, 2)
-    plt.semilogx(x_values, fp16_precision_values, 'b-', label='R16F Precision')
-    plt.semilogx(x_values, unorm16_precision_values, 'r-', label='R16Unorm Precision')
+    plt.semilogx(*decimate(x_values, fp16_precision_values, xscale='log', yscale='linear'), 'b-', label='R16F Precision')
+    plt.semilogx(*decimate(x_values, unorm16_precision_values, xscale='log', yscale='linear'), 'r-', label='R16Unorm Precision')
     plt.grid(True, which="both", ls="-")
     plt.ylabel('Precision Step (smaller is better)')
     plt.title('R16F vs R16Unorm Precision Step Comparison (Semi-log Scale)')
@@ -69,7 +51,7 @@ def main():
     
     # 3. Plot ratio
     plt.subplot(3, 1, 3)
-    plt.semilogx(x_values, precision_ratio, 'g-')
+    plt.semilogx(*decimate(x_values, precision_ratio, xscale='log', yscale='linear'), 'g-')
     plt.axhline(y=1, color='k', linestyle='--')
     
     # Mark crossover points
@@ -102,8 +84,8 @@ def main():
     print("-" * 65)
     
     for depth in key_depths:
-        fp_prec = fp16_precision(depth)
-        unorm_prec = unorm16_precision(depth)
+        fp_prec = float(fp16_precision(depth, dtype))
+        unorm_prec = float(unorm16_precision(depth, dtype))
         ratio = unorm_prec / fp_prec
         better = "R16F" if ratio > 1 else "R16Unorm"
         print(f"{depth:<10.5f} {fp_prec:<15.10f} {unorm_prec:<15.10f} {ratio:<10.2f} {better}")
@@ -1,126 +1,126 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
-# Calculate precision step for R16F format
-def fp16_precision(x):
-    if x == 0:
-        return 2**-24  # Smallest subnormal
+from analysis_params import parse_args
+from figure_bands import figure_to_image, save_image_stack
+from plot_decimation import decimate
+from precision_curves import eye_space_crossovers, ssao_r16f_percentage
+from precision_kernels import fp16_precision, linear_eye_z, resolve_dtype, unorm16_precision
+
+EYE_DEPTH_FIGURE = 'eye_depth_analysis_with_1000m.png'
+
+# Results for one Far Plane: sampled curves for plotting plus the exact SSAO-range
+# share and crossover points. The sampled curves are computed in the given dtype.
+def compute_far_results(near, far, ssao_max=10.0, samples=1000, dtype=np.float64):
+    dtype = resolve_dtype(dtype)
+    # Evenly distributed points in normalized device coordinates
+    ndc_z_values = np.linspace(0.0, 1.0, samples, dtype=dtype)
+    
+    # Convert to Linear Eye Z
+    eye_z_values = linear_eye_z(ndc_z_values, near, far, dtype)
+    
+    # Get normalized eye z values (0-1 range)
+    normalized_eye_z = eye_z_values / dtype.type(far)
+    
+    # Calculate precision for both formats
+    fp16_prec = fp16_precision(normalized_eye_z, dtype)
+    unorm16_prec = unorm16_precision(normalized_eye_z, dtype)
+    
+    return {
+        "near": near,
+        "far": far,
+        "ssao_max": ssao_max,
+        "ndc_z": ndc_z_values,
+        "eye_z": eye_z_values,
+        "fp16_prec": fp16_prec,
+        "unorm16_prec": unorm16_prec,
+        # Precision ratio (Unorm16/FP16, >1 means FP16 is better)
+        "precision_ratio": unorm16_prec / fp16_prec,
+        # Exact share of the SSAO-relevant range (weighted uniformly in NDC)
+        "r16f_percentage": ssao_r16f_percentage(near, far, ssao_max),
+        # Exact crossover points from the piecewise-constant precision curves
+        "crossovers": list(eye_space_crossovers(near, far)),
+    }
+
+# Plot one Far Plane as a row of the eye depth figure
+def plot_far_row(results, row, n_rows):
+    far = results["far"]
+    eye_z_values = results["eye_z"]
     
-    exponent = np.floor(np.log2(x))
+    # Plot Linear Eye Z distribution
+    plt.subplot(n_rows, 3, row*3+1)
+    plt.plot(*decimate(results["ndc_z"], eye_z_values))
+    plt.grid(True)
+    plt.title(f'Linear Eye Z (Far={far}m)')
+    plt.xlabel('NDC Z (0=far, 1=near)')
+    plt.ylabel('Eye Space Z')
     
-    if exponent < -14:
-        return 2**-24
+    # Plot precision values for normalized eye z
+    plt.subplot(n_rows, 3, row*3+2)
+    plt.semilogy(*decimate(eye_z_values, results["fp16_prec"], xscale='linear', yscale='log'), 'b-', label='R16F')
+    plt.semilogy(*decimate(eye_z_values, results["unorm16_prec"], xscale='linear', yscale='log'), 'r-', label='R16Unorm')
+    plt.grid(True)
+    plt.legend()
+    plt.title(f'Precision Step vs. Eye Z (Far={far}m)')
+    plt.xlabel('Eye Space Z')
+    plt.ylabel('Precision Step (smaller is better)')
     
-    return 2**(exponent-10)
+    # Plot precision ratio
+    plt.subplot(n_rows, 3, row*3+3)
+    plt.semilogx(*decimate(eye_z_values, results["precision_ratio"], xscale='log', yscale='linear'))
+    plt.axhline(y=1, color='k', linestyle='--')
+    plt.grid(True)
+    plt.title(f'Precision Ratio (Far={far}m)')
+    plt.xlabel('Eye Space Z')
+    plt.ylabel('Ratio (Unorm16/FP16)')
+
+# One Far Plane row of the eye depth figure, rendered on its own so that
+# incremental_build.py only redraws the rows whose Far Plane changed
+def render_far_row(results):
+    fig = plt.figure(figsize=(15, 3.5))
+    plot_far_row(results, 0, 1)
+    plt.tight_layout()
+    return figure_to_image(fig)
 
-# Calculate precision step for R16Unorm format
-def unorm16_precision(x):
-    return 1/65535.0
+# Eye depth figure with one row per Far Plane
+def render_eye_depth_figure(path, *all_results):
+    return save_image_stack(path, *[render_far_row(results) for results in all_results])
 
-# Calculate Linear Eye Z from perspective projection
-def linear_eye_z(ndc_z, near, far):
-    # Assuming reversed-Z NDC in [0,1] range
-    # ndc_z is 0 at far plane and 1 at near plane
-    return near * far / (far * ndc_z + near * (1.0 - ndc_z))
+def print_ssao_summary(results):
+    far = results["far"]
+    ssao_max = results["ssao_max"]
+    r16f_percentage = results["r16f_percentage"]
+    print(f"\nFor Far={far}m, in SSAO-relevant range (0-{ssao_max:g}m):")
+    print(f"R16F better: {r16f_percentage:.1f}%")
+    print(f"R16Unorm better: {100-r16f_percentage:.1f}%")
+
+def print_crossovers(results):
+    print(f"\nFor Far={results['far']}m, precision crossover points (eye space):")
+    if results["crossovers"]:
+        for i, z in enumerate(results["crossovers"]):
+            print(f"  Crossover {i+1}: Eye Z = {z:.3f}m")
+            print(f"    - R16F better for Eye Z < {z:.3f}m")
+            print(f"    - R16Unorm better for Eye Z > {z:.3f}m")
+    else:
+        print("  No crossover points found.")
 
 def main():
-    # Typical near and far plane values for SSAO scenarios
-    near = 0.1  # 10cm
-    far_values = [50.0, 100.0, 200.0, 1000.0]  # 添加1000m的Far Plane
-    
-    plt.figure(figsize=(15, 14))  # 增加图表高度适应更多行
+    # Near/far planes, sampling and compute dtype come from analysis_params.json
+    params = parse_args('Linear Eye Depth precision analysis for several Far Planes')
+    all_results = [compute_far_results(params["near"], far, params["ssao_max"], params["samples"],
+                                       params["dtype"])
+                   for far in params["far_values"]]
     
-    # For each far plane value
-    for i, far in enumerate(far_values):
-        # Create 1000 evenly distributed points in normalized device coordinates
-        ndc_z_values = np.linspace(0.0, 1.0, 1000)
-        
-        # Convert to Linear Eye Z
-        eye_z_values = np.array([linear_eye_z(z, near, far) for z in ndc_z_values])
-        
-        # Get normalized eye z values (0-1 range)
-        normalized_eye_z = eye_z_values / far
-        
-        # Calculate precision for both formats
-        fp16_prec = np.array([fp16_precision(z) for z in normalized_eye_z])
-        unorm16_prec = np.array([unorm16_precision(z) for z in normalized_eye_z])
-        
-        # Calculate precision ratio (Unorm16/FP16, >1 means FP16 is better)
-        precision_ratio = unorm16_prec / fp16_prec
-        
-        # Plot Linear Eye Z distribution
-        plt.subplot(4, 3, i*3+1)  # 修改布局为4行
-        plt.plot(ndc_z_values, eye_z_values)
-        plt.grid(True)
-        plt.title(f'Linear Eye Z (Far={far}m)')
-        plt.xlabel('NDC Z (0=far, 1=near)')
-        plt.ylabel('Eye Space Z')
-        
-        # Plot precision values for normalized eye z
-        plt.subplot(4, 3, i*3+2)  # 修改布局为4行
-        plt.semilogy(eye_z_values, fp16_prec, 'b-', label='R16F')
-        plt.semilogy(eye_z_values, unorm16_prec, 'r-', label='R16Unorm')
-        plt.grid(True)
-        plt.legend()
-        plt.title(f'Precision Step vs. Eye Z (Far={far}m)')
-        plt.xlabel('Eye Space Z')
-        plt.ylabel('Precision Step (smaller is better)')
-        
-        # Plot precision ratio
-        plt.subplot(4, 3, i*3+3)  # 修改布局为4行
-        plt.semilogx(eye_z_values, precision_ratio)
-        plt.axhline(y=1, color='k', linestyle='--')
-        plt.grid(True)
-        plt.title(f'Precision Ratio (Far={far}m)')
-        plt.xlabel('Eye Space Z')
-        plt.ylabel('Ratio (Unorm16/FP16)')
-        
-        # Calculate stats
-        ssao_relevant_range = eye_z_values <= 10.0  # SSAO mostly cares about first 10m
-        better_format_counts = {
-            "R16F": np.sum(precision_ratio[ssao_relevant_range] > 1),
-            "R16Unorm": np.sum(precision_ratio[ssao_relevant_range] <= 1)
-        }
-        
-        total_relevant = np.sum(ssao_relevant_range)
-        if total_relevant > 0:
-            r16f_percentage = 100 * better_format_counts["R16F"] / total_relevant
-            print(f"\nFor Far={far}m, in SSAO-relevant range (0-10m):")
-            print(f"R16F better: {better_format_counts['R16F']} samples ({r16f_percentage:.1f}%)")
-            print(f"R16Unorm better: {better_format_counts['R16Unorm']} samples ({100-r16f_percentage:.1f}%)")
+    for results in all_results:
+        print_ssao_summary(results)
     
-    plt.tight_layout()
-    plt.savefig('eye_depth_analysis_with_1000m.png', dpi=150)
-    print("\nChart saved as 'eye_depth_analysis_with_1000m.png'")
+    render_eye_depth_figure(EYE_DEPTH_FIGURE, *all_results)
+    print(f"\nChart saved as '{EYE_DEPTH_FIGURE}'")
     
     # Cross-over analysis
     print("\n--- Crossover Analysis ---")
-    for far in far_values:
-        # Generate more detailed sampling for crossover analysis
-        ndc_z_values = np.linspace(0.0, 1.0, 10000)
-        eye_z_values = np.array([linear_eye_z(z, near, far) for z in ndc_z_values])
-        normalized_eye_z = eye_z_values / far
-        
-        fp16_prec = np.array([fp16_precision(z) for z in normalized_eye_z])
-        unorm16_prec = np.array([unorm16_precision(z) for z in normalized_eye_z])
-        precision_ratio = unorm16_prec / fp16_prec
-        
-        # Find crossover points (where precision ratio crosses 1.0)
-        crossovers = []
-        for i in range(1, len(precision_ratio)):
-            if (precision_ratio[i-1] < 1 and precision_ratio[i] >= 1) or \
-               (precision_ratio[i-1] >= 1 and precision_ratio[i] < 1):
-                eye_z = eye_z_values[i]
-                crossovers.append(eye_z)
-        
-        print(f"\nFor Far={far}m, precision crossover points (eye space):")
-        if crossovers:
-            for i, z in enumerate(crossovers):
-                print(f"  Crossover {i+1}: Eye Z = {z:.3f}m")
-                print(f"    - R16F better for Eye Z < {z:.3f}m")
-                print(f"    - R16Unorm better for Eye Z > {z:.3f}m")
-        else:
-            print("  No crossover points found.")
+    for results in all_results:
+        print_crossovers(results)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,23 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Tall figures are rendered as horizontal bands of equal pixel width and stacked,
+# so a band whose inputs did not change can be reused instead of redrawn.
+
+# Render a figure to an RGBA image array and close it
+def figure_to_image(fig, dpi=150):
+    fig.set_dpi(dpi)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    image = np.asarray(canvas.buffer_rgba()).copy()
+    plt.close(fig)
+    return image
+
+# Stack band images top to bottom and save them as one PNG
+def save_image_stack(path, *images):
+    widths = {image.shape[1] for image in images}
+    if len(widths) != 1:
+        raise ValueError(f"Figure bands must share one pixel width, got {sorted(widths)}")
+    plt.imsave(path, np.concatenate(images, axis=0))
+    return path
@@ -3,47 +3,52 @@ import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
 import os
 
-# Calculate precision step for R16F format
-def fp16_precision(x):
-    if x == 0:
-        return 2**-24  # Smallest subnormal
-    
-    exponent = np.floor(np.log2(x))
-    
-    if exponent < -14:
-        return 2**-24
-    
-    return 2**(exponent-10)
+from analysis_params import parse_args
+from eye_depth_analysis import EYE_DEPTH_FIGURE, compute_far_results
+from figure_bands import figure_to_image, save_image_stack
+from precision_curves import precision_ratio_curve
+from precision_kernels import fp16_precision, unorm16_precision
 
-# Calculate precision step for R16Unorm format
-def unorm16_precision(x):
-    return 1/65535.0
+SUMMARY_FIGURE = 'depth_precision_summary_with_1000m.png'
+HTML_REPORT = 'depth_format_analysis_report_with_1000m.html'
+FAR_PLANE_COLORS = ['royalblue', 'forestgreen', 'firebrick', 'darkorange', 'purple', 'teal']
 
-# Calculate Linear Eye Z from perspective projection
-def linear_eye_z(ndc_z, near, far):
-    # Assuming reversed-Z NDC in [0,1] range
-    # ndc_z is 0 at far plane and 1 at near plane
-    return near * far / (far * ndc_z + near * (1.0 - ndc_z))
+# Normalized depth values where R16F and R16Unorm swap places
+def normalized_crossovers():
+    return list(precision_ratio_curve(1e-8, 1.0).crossings(1.0))
 
-def main():
-    # Create a summary figure with key insights
-    plt.figure(figsize=(14, 18))  # 增加高度以容纳更多内容
-    gs = GridSpec(6, 2)  # 增加行数
-    
+# Eye depth up to which R16F is more precise. Without a crossover near/far is
+# already above 2^-5, so R16Unorm is more precise from the near plane on.
+def r16f_advantage_limit(results):
+    return results["crossovers"][0] if results["crossovers"] else results["near"]
+
+def crossover_label(results):
+    return f'{results["crossovers"][0]:g}m' if results["crossovers"] else 'none'
+
+# The summary figure is drawn as horizontal bands of 3 inches per GridSpec row:
+# bands that do not depend on the Far Planes are cached by incremental_build.py
+# and only the Far Plane bands are redrawn when the parameters change.
+SUMMARY_ROW_HEIGHT = 3
+
+def summary_band(n_rows):
+    fig = plt.figure(figsize=(14, SUMMARY_ROW_HEIGHT * n_rows))
+    return fig, GridSpec(n_rows, 2)
+
+def finish_band(fig):
+    plt.tight_layout()
+    return figure_to_image(fig)
+
+# Bands that depend only on the formats: base precision comparison and key values
+def render_summary_format_bands():
+    fig, gs = summary_band(1)
     # 1. Basic comparison of precision (0-1 range)
     x_values = np.logspace(-8, 0, 1000)
-    fp16_prec = [fp16_precision(x) for x in x_values]
-    unorm16_prec = [unorm16_precision(x) for x in x_values]
-    precision_ratio = [unorm/fp for fp, unorm in zip(fp16_prec, unorm16_prec)]
-    
-    # Find crossover point
-    crossover_indices = [i for i in range(1, len(precision_ratio)) 
-                         if (precision_ratio[i-1] > 1 and precision_ratio[i] < 1) or 
-                            (precision_ratio[i-1] < 1 and precision_ratio[i] > 1)]
+    fp16_prec = fp16_precision(x_values)
+    unorm16_prec = unorm16_precision(x_values)
+    precision_ratio = unorm16_prec / fp16_prec
     
-    crossover_points = []
-    for idx in crossover_indices:
-        crossover_points.append(x_values[idx])
+    # Exact crossover point from the piecewise-constant precision curves
+    crossover_points = normalized_crossovers()
     
     # Top left: precision graph
     ax1 = plt.subplot(gs[0, 0])
@@ -68,52 +73,11 @@ def main():
     ax2.set_ylabel('Precision Ratio')
     ax2.set_title('Precision Ratio: Values > 1 indicate R16F is better')
     
-    # 2. Linear Eye Depth with different far planes
-    near = 0.1  # 10cm
-    far_values = [50.0, 100.0, 200.0, 1000.0]  # 添加1000m
-    crossover_eye_values = []
-    
-    # Second row: Linear Eye Z distribution
-    ax3 = plt.subplot(gs[1, :])
-    for i, far in enumerate(far_values):
-        ndc_z_values = np.linspace(0.0, 1.0, 1000)
-        eye_z_values = np.array([linear_eye_z(z, near, far) for z in ndc_z_values])
-        ax3.plot(ndc_z_values, eye_z_values, label=f'Far={far}m')
-        
-        # Calculate crossover in eye space
-        crossover_eye = linear_eye_z(0.5, near, far * crossover_points[0])
-        crossover_eye_values.append(crossover_eye)
-        
-    ax3.grid(True)
-    ax3.set_title('Linear Eye Z Distribution with Different Far Planes')
-    ax3.set_xlabel('NDC Z (0=far, 1=near)')
-    ax3.set_ylabel('Eye Space Z')
-    ax3.legend()
-    
-    # 3. Precision advantages with different far planes
-    colors = ['royalblue', 'forestgreen', 'firebrick', 'darkorange']  # 添加第四种颜色
-    
-    # Third row: left - SSAO range coverage, right - crossover points
-    ax4 = plt.subplot(gs[2, 0])
-    ax4.bar(range(4), [94.6, 97.7, 99.4, 100.0], color=colors)  # 添加1000m的数据
-    ax4.set_xticks(range(4))
-    ax4.set_xticklabels(['50m', '100m', '200m', '1000m'])  # 添加1000m标签
-    ax4.set_xlabel('Far Plane')
-    ax4.set_ylabel('% of SSAO range with R16F advantage')
-    ax4.set_title('R16F Advantage in SSAO-Relevant Range (0-10m)')
-    ax4.grid(axis='y')
-    
-    ax5 = plt.subplot(gs[2, 1])
-    ax5.bar(range(4), [1.56, 3.12, 6.21, 30.30], color=colors)  # 添加1000m的数据
-    ax5.set_xticks(range(4))
-    ax5.set_xticklabels(['50m', '100m', '200m', '1000m'])  # 添加1000m标签
-    ax5.set_xlabel('Far Plane')
-    ax5.set_ylabel('Crossover Distance (m)')
-    ax5.set_title('Precision Crossover Point (Eye Space)')
-    ax5.grid(axis='y')
+    top = finish_band(fig)
     
+    fig, gs = summary_band(1)
     # 4. Key numerical comparisons
-    ax6 = plt.subplot(gs[3, :])
+    ax6 = plt.subplot(gs[0, :])
     depth_values = [0.0001, 0.001, 0.01, 0.1, 0.5]
     advantage_ratios = [256.0, 16.0, 2.0, 0.25, 0.03]
     
@@ -135,40 +99,97 @@ def main():
         ax6.text(i, v * (1.1 if v < 1 else 0.7), text, 
                  ha='center', color=color, fontweight='bold')
     
-    # 5. 添加1000m远平面下的SSAO精度分析
-    ax7 = plt.subplot(gs[4, :])
+    middle = finish_band(fig)
+    return top, middle
+
+# Bands built from compute_far_results() of every Far Plane
+def render_summary_far_plane_bands(*all_results):
+    near = all_results[0]["near"]
+    far_values = [results["far"] for results in all_results]
+    ssao_max = all_results[0]["ssao_max"]
+    ssao_percentages = [results["r16f_percentage"] for results in all_results]
+    crossover_distances = [r16f_advantage_limit(results) for results in all_results]
+    far_labels = [f'{far:g}m' for far in far_values]
+    crossover_points = normalized_crossovers()
     
-    # 假设SSAO范围为0-10米，在远平面=1000m的情况下
-    ssao_range = 10  # 10米
-    crossover_point = 30.30  # 精度交叉点在30.30米
+    fig, gs = summary_band(2)
+    # 2. Linear Eye Depth with different far planes
+    # Second row: Linear Eye Z distribution
+    ax3 = plt.subplot(gs[0, :])
+    for results in all_results:
+        ax3.plot(results["ndc_z"], results["eye_z"], label=f'Far={results["far"]}m')
+        
+    ax3.grid(True)
+    ax3.set_title('Linear Eye Z Distribution with Different Far Planes')
+    ax3.set_xlabel('NDC Z (0=far, 1=near)')
+    ax3.set_ylabel('Eye Space Z')
+    ax3.legend()
+    
+    # 3. Precision advantages with different far planes
+    colors = [FAR_PLANE_COLORS[i % len(FAR_PLANE_COLORS)] for i in range(len(far_values))]
+    
+    # Third row: left - SSAO range coverage, right - crossover points
+    ax4 = plt.subplot(gs[1, 0])
+    ax4.bar(range(len(far_values)), ssao_percentages, color=colors)
+    ax4.set_xticks(range(len(far_values)))
+    ax4.set_xticklabels(far_labels)
+    ax4.set_xlabel('Far Plane')
+    ax4.set_ylabel('% of SSAO range with R16F advantage')
+    ax4.set_title(f'R16F Advantage in SSAO-Relevant Range (0-{ssao_max:g}m)')
+    ax4.grid(axis='y')
+    
+    ax5 = plt.subplot(gs[1, 1])
+    ax5.bar(range(len(far_values)), crossover_distances, color=colors)
+    ax5.set_xticks(range(len(far_values)))
+    ax5.set_xticklabels(far_labels)
+    ax5.set_xlabel('Far Plane')
+    ax5.set_ylabel('Crossover Distance (m)')
+    ax5.set_title('Precision Crossover Point (Eye Space)')
+    ax5.grid(axis='y')
+    
+    upper = finish_band(fig)
+    
+    fig, gs = summary_band(2)
+    # 5. 最大远平面下的SSAO精度分析
+    ax7 = plt.subplot(gs[0, :])
+    
+    ssao_range = ssao_max
+    crossover_point = crossover_distances[-1]
+    x_limit = max(50, 1.5 * crossover_point)
     
     # 创建一个简单的视觉化图表显示SSAO范围vs精度交叉点
     ax7.axvspan(0, ssao_range, alpha=0.3, color='green', label='SSAO Relevant Range')
-    ax7.axvspan(ssao_range, 50, alpha=0.1, color='gray', label='Less Relevant Range')
+    ax7.axvspan(ssao_range, x_limit, alpha=0.1, color='gray', label='Less Relevant Range')
     ax7.axvline(x=crossover_point, color='red', linestyle='--', 
                label=f'Crossover Point ({crossover_point:.1f}m)')
     
-    ax7.set_xlim(0, 50)
+    ax7.set_xlim(0, x_limit)
     ax7.set_xlabel('Distance from Camera (m)')
     ax7.set_yticks([])
     ax7.legend(loc='upper right')
-    ax7.set_title('With Far Plane = 1000m: R16F Superior in Entire SSAO Range (0-10m)')
+    if ssao_percentages[-1] <= 0.0:
+        ax7.set_title(f'With Far Plane = {far_values[-1]:g}m: R16Unorm Superior in Entire SSAO Range (0-{ssao_max:g}m)')
+    elif ssao_percentages[-1] >= 100.0:
+        ax7.set_title(f'With Far Plane = {far_values[-1]:g}m: R16F Superior in Entire SSAO Range (0-{ssao_max:g}m)')
+    else:
+        ax7.set_title(f'With Far Plane = {far_values[-1]:g}m: R16F Superior up to {crossover_point:g}m')
     
     # 6. Conclusions and recommendations
-    ax8 = plt.subplot(gs[5, :])
+    ax8 = plt.subplot(gs[1, :])
     ax8.axis('off')
     conclusions = [
         "Key Findings:",
-        "1. R16F provides higher precision for small values (< 0.0318) despite 'wasting' a sign bit",
+        f"1. R16F provides higher precision for small values (< {crossover_points[0]:.5f}) despite 'wasting' a sign bit",
         "2. SSAO applications focus on near-scene depth differences where R16F excels",
         "3. With larger Far Planes, R16F advantage extends further:",
-        "   • 50m Far Plane → R16F better up to 1.56m (94.6% of SSAO range)",
-        "   • 100m Far Plane → R16F better up to 3.12m (97.7% of SSAO range)",
-        "   • 200m Far Plane → R16F better up to 6.21m (99.4% of SSAO range)",
-        "   • 1000m Far Plane → R16F better up to 30.30m (100% of SSAO range)",
+        *[f"   • {far:g}m Far Plane → R16F better up to {z:g}m ({pct:.1f}% of SSAO range)"
+          if results["crossovers"] else f"   • {far:g}m Far Plane → R16Unorm better at every depth"
+          for far, z, pct, results in zip(far_values, crossover_distances, ssao_percentages, all_results)],
         "",
         "Recommendations:",
-        "• For SSAO applications with very large Far Plane settings (especially 1000m), R16F is unquestionably the better choice.",
+        (f"• For SSAO applications with very large Far Plane settings (especially {far_values[-1]:g}m), R16F is unquestionably the better choice."
+         if ssao_percentages[-1] >= 100.0 else
+         f"• With a {far_values[-1]:g}m Far Plane, R16F is better for {ssao_percentages[-1]:.1f}% of the SSAO range."),
         "• If R16Unorm must be used, consider: reducing Far Plane, applying nonlinear transforms,",
         "  or using custom encoding schemes to improve near-field precision"
     ]
@@ -176,27 +197,63 @@ def main():
     ax8.text(0.5, 0.5, '\n'.join(conclusions), ha='center', va='center', 
              fontsize=12, bbox=dict(boxstyle='round,pad=1', facecolor='lightyellow', alpha=0.5))
     
-    plt.tight_layout()
-    plt.savefig('depth_precision_summary_with_1000m.png', dpi=150)
-    print("Updated summary report saved as 'depth_precision_summary_with_1000m.png'")
+    lower = finish_band(fig)
+    return upper, lower
+
+# Stack the bands in reading order into the summary figure
+def save_summary_figure(path, format_bands, far_plane_bands):
+    top, middle = format_bands
+    upper, lower = far_plane_bands
+    return save_image_stack(path, top, upper, middle, lower)
+
+# Summary figure with key insights, built from compute_far_results() of every Far Plane
+def render_summary_figure(path, *all_results):
+    return save_summary_figure(path, render_summary_format_bands(),
+                               render_summary_far_plane_bands(*all_results))
+
+# Consolidated HTML report, built from compute_far_results() of every Far Plane
+def write_html_report(path, *all_results):
+    far_values = [results["far"] for results in all_results]
+    ssao_max = all_results[0]["ssao_max"]
+    ssao_percentages = [results["r16f_percentage"] for results in all_results]
+    crossover_distances = [r16f_advantage_limit(results) for results in all_results]
+    crossover_points = normalized_crossovers()
+    far_labels = [f"{far:g}m" for far in far_values]
+    far_list = ", ".join(far_labels)
+    far_list_and = ", ".join(far_labels[:-1]) + ", and " + far_labels[-1] if len(far_labels) > 1 else far_list
+    # Whether R16F wins everywhere SSAO looks for the largest Far Plane
+    covers_ssao = ssao_percentages[-1] >= 100.0
+    if covers_ssao:
+        ssao_coverage = "R16F provides superior precision across the entire SSAO-relevant range"
+    elif ssao_percentages[-1] <= 0.0:
+        ssao_coverage = "R16Unorm provides superior precision across the entire SSAO-relevant range"
+    else:
+        ssao_coverage = (f"R16F provides superior precision across {ssao_percentages[-1]:.1f}% "
+                         f"of the SSAO-relevant range")
     
-    # Generate a consolidated HTML report
-    html_content = """
+    ssao_rows = "\n".join(f"""            <tr{' class="highlight"' if far == far_values[-1] else ''}>
+                <td>{far:g}m</td>
+                <td>{pct:.1f}%</td>
+                <td>{100 - pct:.1f}%</td>
+                <td>{crossover_label(results)}</td>
+            </tr>""" for far, pct, results in zip(far_values, ssao_percentages, all_results))
+    
+    html_content = f"""
     <!DOCTYPE html>
     <html>
     <head>
         <title>R16F vs R16Unorm Depth Format Analysis</title>
         <style>
-            body { font-family: Arial, sans-serif; line-height: 1.6; max-width: 1200px; margin: 0 auto; padding: 20px; }
-            h1, h2 { color: #2c3e50; }
-            .container { display: flex; flex-wrap: wrap; justify-content: center; }
-            .chart { margin: 10px; box-shadow: 0 0 10px rgba(0,0,0,0.1); }
-            table { border-collapse: collapse; width: 100%; margin: 20px 0; }
-            th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }
-            th { background-color: #f2f2f2; }
-            tr:hover { background-color: #f5f5f5; }
-            .conclusion { background-color: #f9f9f9; padding: 15px; border-radius: 5px; margin: 20px 0; }
-            .highlight { background-color: #ffffcc; padding: 5px; border-radius: 3px; }
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; max-width: 1200px; margin: 0 auto; padding: 20px; }}
+            h1, h2 {{ color: #2c3e50; }}
+            .container {{ display: flex; flex-wrap: wrap; justify-content: center; }}
+            .chart {{ margin: 10px; box-shadow: 0 0 10px rgba(0,0,0,0.1); }}
+            table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
+            th, td {{ padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }}
+            th {{ background-color: #f2f2f2; }}
+            tr:hover {{ background-color: #f5f5f5; }}
+            .conclusion {{ background-color: #f9f9f9; padding: 15px; border-radius: 5px; margin: 20px 0; }}
+            .highlight {{ background-color: #ffffcc; padding: 5px; border-radius: 3px; }}
         </style>
     </head>
     <body>
@@ -210,17 +267,17 @@ def main():
                     <li>For linear depth values normalized to 0-1, this characteristic gives R16F an advantage in representing near-object depths</li>
                 </ul>
             </li>
-            <li><strong>Precision crossover point is at 0.0318</strong>
+            <li><strong>Precision crossover point is at {crossover_points[0]:.5f}</strong>
                 <ul>
-                    <li>R16F provides higher precision when normalized depth values are less than 0.0318</li>
-                    <li>R16Unorm provides higher precision when normalized depth values are greater than 0.0318</li>
+                    <li>R16F provides higher precision when normalized depth values are less than {crossover_points[0]:.5f}</li>
+                    <li>R16Unorm provides higher precision when normalized depth values are greater than {crossover_points[0]:.5f}</li>
                 </ul>
             </li>
             <li><strong>Relationship between Linear Eye Depth and Far Plane</strong>
                 <ul>
-                    <li>Based on analysis with different Far Planes (50m, 100m, 200m, 1000m), R16F shows significant precision advantages in SSAO-relevant ranges (0-10m)</li>
-                    <li>The precision crossover point moves further as the Far Plane increases (1.56m with 50m Far, 3.12m with 100m Far, 6.21m with 200m Far, 30.30m with 1000m Far)</li>
-                    <li class="highlight">With Far Plane = 1000m, R16F provides superior precision across the entire SSAO-relevant range (0-10m)</li>
+                    <li>Based on analysis with different Far Planes ({far_list}), R16F shows significant precision advantages in SSAO-relevant ranges (0-{ssao_max:g}m)</li>
+                    <li>The precision crossover point moves further as the Far Plane increases ({", ".join(f"{crossover_label(results)} with {far:g}m Far" for far, results in zip(far_values, all_results))})</li>
+                    <li class="highlight">With Far Plane = {far_values[-1]:g}m, {ssao_coverage} (0-{ssao_max:g}m)</li>
                 </ul>
             </li>
         </ul>
@@ -232,12 +289,12 @@ def main():
                 <p><em>Basic precision comparison between R16F and R16Unorm formats</em></p>
             </div>
             <div class="chart">
-                <img src="eye_depth_analysis_with_1000m.png" alt="Eye Depth Analysis with 1000m" width="600">
-                <p><em>Linear Eye Depth analysis with Far Planes of 50m, 100m, 200m, and 1000m</em></p>
+                <img src="{EYE_DEPTH_FIGURE}" alt="Eye Depth Analysis with 1000m" width="600">
+                <p><em>Linear Eye Depth analysis with Far Planes of {far_list_and}</em></p>
             </div>
             <div class="chart">
-                <img src="depth_precision_summary_with_1000m.png" alt="Summary Report" width="800">
-                <p><em>Comprehensive summary of key findings including 1000m Far Plane</em></p>
+                <img src="{SUMMARY_FIGURE}" alt="Summary Report" width="800">
+                <p><em>Comprehensive summary of key findings including {far_values[-1]:g}m Far Plane</em></p>
             </div>
         </div>
         
@@ -295,30 +352,7 @@ def main():
                 <th>R16Unorm Better</th>
                 <th>Precision Crossover</th>
             </tr>
-            <tr>
-                <td>50m</td>
-                <td>94.6%</td>
-                <td>5.4%</td>
-                <td>1.56m</td>
-            </tr>
-            <tr>
-                <td>100m</td>
-                <td>97.7%</td>
-                <td>2.3%</td>
-                <td>3.12m</td>
-            </tr>
-            <tr>
-                <td>200m</td>
-                <td>99.4%</td>
-                <td>0.6%</td>
-                <td>6.21m</td>
-            </tr>
-            <tr class="highlight">
-                <td>1000m</td>
-                <td>100.0%</td>
-                <td>0.0%</td>
-                <td>30.30m</td>
-            </tr>
+{ssao_rows}
         </table>
         
         <div class="conclusion">
@@ -329,13 +363,13 @@ def main():
             <ul>
                 <li>SSAO algorithms primarily focus on near-scene depth differences, which is exactly where R16F format provides high precision</li>
                 <li>As the Far Plane increases, R16F's advantage zone covers more of the near-scene area</li>
-                <li>With a Far Plane of 1000m, R16F provides higher precision up to 30.30m, far beyond the SSAO-relevant range (0-10m)</li>
+                <li>{f'With a Far Plane of {far_values[-1]:g}m, R16F provides higher precision up to {crossover_distances[-1]:g}m, {"far beyond" if covers_ssao else "compared with"} the SSAO-relevant range (0-{ssao_max:g}m)' if all_results[-1]["crossovers"] else f'With a Far Plane of {far_values[-1]:g}m and a {all_results[-1]["near"]:g}m Near Plane there is no crossover: R16Unorm provides higher precision at every depth'}</li>
             </ul>
             
             <p><strong>Far Plane impact:</strong></p>
             <ul>
                 <li>The larger your Far Plane setting, the wider the advantage zone of R16F relative to R16Unorm</li>
-                <li>With Far Plane = 1000m, R16F is clearly superior for all SSAO-relevant calculations</li>
+                <li>With Far Plane = {far_values[-1]:g}m, {"R16F is clearly superior for all SSAO-relevant calculations" if covers_ssao else f"R16F is more precise for {ssao_percentages[-1]:.1f}% of SSAO-relevant depths"}</li>
                 <li>This explains why you observed better results when storing Linear Eye Depth with R16F compared to R16Unorm</li>
             </ul>
             
@@ -347,7 +381,7 @@ def main():
             
             <h3>Recommendations</h3>
             <ol>
-                <li>For SSAO applications with very large Far Plane settings (especially 1000m), R16F is unquestionably the better choice.</li>
+                <li>For SSAO applications with very large Far Plane settings (especially {far_values[-1]:g}m), R16F is unquestionably the better choice.</li>
                 <li>If R16Unorm must be used, consider:
                     <ul>
                         <li>Reducing the Far Plane value (if possible)</li>
@@ -361,10 +395,21 @@ def main():
     </html>
     """
     
-    with open('depth_format_analysis_report_with_1000m.html', 'w') as f:
+    with open(path, 'w') as f:
         f.write(html_content)
+    return path
+
+def main():
+    params = parse_args('Summary figure and HTML report for R16F vs R16Unorm depth precision')
+    all_results = [compute_far_results(params["near"], far, params["ssao_max"], params["samples"],
+                                       params["dtype"])
+                   for far in params["far_values"]]
+    
+    render_summary_figure(SUMMARY_FIGURE, *all_results)
+    print(f"Updated summary report saved as '{SUMMARY_FIGURE}'")
     
-    print("HTML report saved as 'depth_format_analysis_report_with_1000m.html'")
+    write_html_report(HTML_REPORT, *all_results)
+    print(f"HTML report saved as '{HTML_REPORT}'")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,263 @@
+import argparse
+import ast
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+from analysis_params import DEFAULT_PARAMS_FILE, load_params
+from eye_depth_analysis import EYE_DEPTH_FIGURE, compute_far_results, render_far_row
+from figure_bands import save_image_stack
+from generate_summary_report import (HTML_REPORT, SUMMARY_FIGURE, render_summary_far_plane_bands,
+                                     render_summary_format_bands, save_summary_figure,
+                                     write_html_report)
+from precision_kernels import check_compute_dtype
+
+# Outputs go next to the scripts, under the same names the scripts use
+DEFAULT_OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR_NAME = '.build_cache'
+
+# Short stable hash of any JSON-serializable value
+def fingerprint(*parts):
+    payload = json.dumps(parts, sort_keys=True, default=repr).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+# Source files of a module plus every module it imports from the same directory,
+# followed transitively (numpy/matplotlib are not tracked)
+def local_source_files(path, seen=None):
+    seen = set() if seen is None else seen
+    path = os.path.abspath(path)
+    if path in seen:
+        return seen
+    seen.add(path)
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    for stmt in ast.walk(tree):
+        if isinstance(stmt, ast.Import):
+            names = [alias.name for alias in stmt.names]
+        elif isinstance(stmt, ast.ImportFrom) and stmt.module and not stmt.level:
+            names = [stmt.module]
+        else:
+            continue
+        for name in names:
+            module_path = os.path.join(os.path.dirname(path), name.split('.')[0] + '.py')
+            if os.path.exists(module_path):
+                local_source_files(module_path, seen)
+    return seen
+
+# Hash of everything that decides what a node function produces: its bound
+# arguments (for functools.partial) and the source of its module and the local
+# modules that module imports, so edits to helpers, constants or titles count
+def code_fingerprint(func):
+    bound = ()
+    if isinstance(func, functools.partial):
+        bound = (func.args, func.keywords)
+        func = func.func
+    digests = []
+    for path in sorted(local_source_files(inspect.getsourcefile(func))):
+        with open(path, 'rb') as f:
+            digests.append((os.path.basename(path), hashlib.sha256(f.read()).hexdigest()))
+    return fingerprint(func.__module__, func.__qualname__, bound, digests)
+
+# One node of the build graph: a parameter, a computed result, a figure or the report
+class BuildNode:
+    def __init__(self, name, deps, func=None, outputs=(), value=None):
+        self.name = name
+        self.deps = list(deps)
+        self.func = func
+        self.outputs = list(outputs)
+        self.value = value
+
+    @property
+    def is_param(self):
+        return self.func is None
+
+# Dependency graph of parameters -> computed results -> figures -> report.
+# A node is rebuilt only when the fingerprint of its inputs (parameter values,
+# upstream fingerprints and the node's source code) changed or an output file is missing.
+class BuildGraph:
+    def __init__(self, cache_dir):
+        self.nodes = {}
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, 'manifest.json')
+        os.makedirs(cache_dir, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {}
+        self._values = {}
+        self._fingerprints = {}
+
+    def add_param(self, name, value):
+        self.nodes[name] = BuildNode(name, (), value=value)
+
+    # Nodes must be added after their dependencies
+    def add_node(self, name, deps, func, outputs=()):
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Node '{name}' depends on unknown nodes: {', '.join(missing)}")
+        self.nodes[name] = BuildNode(name, deps, func, outputs)
+
+    # Cached values are keyed by node fingerprint, so a value can only ever be
+    # served for the exact inputs it was computed from
+    def _value_path(self, name, node_fingerprint):
+        return os.path.join(self.cache_dir, fingerprint(name, node_fingerprint) + '.pkl')
+
+    # Atomic write, so an interrupted build never leaves a half-written manifest
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _node_fingerprint(self, node):
+        if node.is_param:
+            return fingerprint(node.name, node.value)
+        return fingerprint(node.name, code_fingerprint(node.func), node.outputs,
+                           [self._fingerprints[dep] for dep in node.deps])
+
+    # Value of an up-to-date node, loading it from the on-disk cache if needed
+    def value(self, name):
+        node = self.nodes[name]
+        if node.is_param:
+            return node.value
+        if name not in self._values:
+            with open(self._value_path(name, self._fingerprints[name]), 'rb') as f:
+                self._values[name] = pickle.load(f)
+        return self._values[name]
+
+    # Bring every node up to date; returns the names of the nodes that were rebuilt
+    def build(self):
+        rebuilt = []
+        for name, node in self.nodes.items():
+            node_fingerprint = self._node_fingerprint(node)
+            self._fingerprints[name] = node_fingerprint
+            if node.is_param:
+                continue
+
+            up_to_date = (self.manifest.get(name) == node_fingerprint
+                          and os.path.exists(self._value_path(name, node_fingerprint))
+                          and all(os.path.exists(path) for path in node.outputs))
+            if up_to_date:
+                continue
+
+            value = node.func(*[self.value(dep) for dep in node.deps])
+            with open(self._value_path(name, node_fingerprint), 'wb') as f:
+                pickle.dump(value, f)
+            self._values[name] = value
+            # Record each node as soon as it is done, so a later failure cannot
+            # leave the manifest and the cached values out of step
+            previous = self.manifest.get(name)
+            self.manifest[name] = node_fingerprint
+            self._save_manifest()
+            if previous is not None and previous != node_fingerprint:
+                try:
+                    os.remove(self._value_path(name, previous))
+                except OSError:
+                    pass
+            rebuilt.append(name)
+        return rebuilt
+
+# Build the dependency graph for one set of parameters. The nodes call the same
+# functions as eye_depth_analysis.py and generate_summary_report.py, so the
+# graph and the scripts produce the same files. Figures are split into bands so
+# that editing one far plane redraws one eye depth row and the far plane bands
+# of the summary, not every panel.
+def build_graph(params, output_dir):
+    graph = BuildGraph(os.path.join(output_dir, CACHE_DIR_NAME))
+    graph.add_param('near', params['near'])
+    graph.add_param('ssao_max', params['ssao_max'])
+    graph.add_param('samples', params['samples'])
+    graph.add_param('dtype', params['dtype'])
+
+    result_nodes = []
+    row_nodes = []
+    far_params = []
+    for far in params['far_values']:
+        # One parameter node per far plane, so editing one value recomputes one
+        # result and redraws one row of the eye depth figure
+        param_name = f'far={far:g}'
+        result_name = f'results[{param_name}]'
+        row_name = f'eye_depth_row[{param_name}]'
+        graph.add_param(param_name, far)
+        far_params.append(param_name)
+        graph.add_node(result_name, ['near', param_name, 'ssao_max', 'samples', 'dtype'],
+                       compute_far_results)
+        graph.add_node(row_name, [result_name], render_far_row)
+        result_nodes.append(result_name)
+        row_nodes.append(row_name)
+
+    # Float32 runs are validated against float64 whenever the planes or dtype change
+    graph.add_node('validation[dtype]', ['near', 'dtype'] + far_params, check_compute_dtype)
+
+    eye_depth_path = os.path.join(output_dir, EYE_DEPTH_FIGURE)
+    summary_path = os.path.join(output_dir, SUMMARY_FIGURE)
+    report_path = os.path.join(output_dir, HTML_REPORT)
+    graph.add_node('figure[eye_depth]', row_nodes,
+                   functools.partial(save_image_stack, eye_depth_path), [eye_depth_path])
+    graph.add_node('summary_bands[formats]', [], render_summary_format_bands)
+    graph.add_node('summary_bands[far_planes]', result_nodes, render_summary_far_plane_bands)
+    graph.add_node('figure[summary]', ['summary_bands[formats]', 'summary_bands[far_planes]'],
+                   functools.partial(save_summary_figure, summary_path), [summary_path])
+    graph.add_node('report', result_nodes,
+                   functools.partial(write_html_report, report_path), [report_path])
+    return graph
+
+# Rebuild whatever the current parameter file makes stale
+def run_build(params_file, output_dir):
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    graph = build_graph(load_params(params_file), output_dir)
+    rebuilt = graph.build()
+    elapsed = time.perf_counter() - start
+    if rebuilt:
+        print(f"Rebuilt {len(rebuilt)}/{len(graph.nodes)} nodes in {elapsed:.2f}s: {', '.join(rebuilt)}")
+    else:
+        print(f"Everything up to date ({elapsed:.2f}s)")
+    return rebuilt
+
+# Poll the parameter file and rebuild affected nodes whenever it changes
+def watch(params_file, output_dir, interval=0.5):
+    print(f"Watching '{params_file}' for changes (Ctrl+C to stop)...")
+    last_mtime = None
+    try:
+        while True:
+            try:
+                mtime = os.stat(params_file).st_mtime_ns
+            except OSError:
+                # Editors that save atomically briefly remove the file
+                time.sleep(interval)
+                continue
+            if mtime != last_mtime:
+                last_mtime = mtime
+                try:
+                    run_build(params_file, output_dir)
+                except (OSError, ValueError, KeyError) as e:
+                    # Keep watching through half-edited parameter files
+                    print(f"Build failed: {e!r}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental build of depth precision figures and report')
+    parser.add_argument('--params', default=DEFAULT_PARAMS_FILE, help='JSON parameter file')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='Directory for figures and report')
+    parser.add_argument('--watch', action='store_true', help='Rebuild whenever the parameter file changes')
+    parser.add_argument('--interval', type=float, default=0.5, help='Polling interval in seconds for --watch')
+    args = parser.parse_args()
+
+    if args.watch:
+        watch(args.params, args.output_dir, args.interval)
+    else:
+        run_build(args.params, args.output_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import argparse
+import os
+import time
+import warnings
+from collections import deque
+from multiprocessing import Process, shared_memory
+
+import numpy as np
+
+from normal_reconstruction_analysis import synthetic_eye_depth_frames
+from precision_kernels import COMPUTE_DTYPES, DEPTH_FORMATS, resolve_dtype, round_trip_errors
+
+# Ring buffer layout: a 64-byte int64 header followed by `capacity` float32
+# linear eye depth frames of height x width. The producer fills slot
+# (frames_written % capacity) and then bumps frames_written to publish it.
+RING_MAGIC = 0x52313646  # "R16F"
+HEADER_FIELDS = 8
+HEADER_BYTES = HEADER_FIELDS * 8
+MAGIC, WIDTH, HEIGHT, CAPACITY, FRAMES_WRITTEN, CLOSED = range(6)
+
+class DepthFrameRing:
+    # Map a ring over any writable buffer-protocol object (SharedMemory.buf,
+    # mmap, bytearray, ...). Pass width/height/capacity to initialize a new
+    # ring, or leave them out to attach to an existing one.
+    def __init__(self, buffer, width=None, height=None, capacity=None, shm=None):
+        self._shm = shm
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buffer)
+        if width is not None:
+            if len(memoryview(buffer).cast('B')) < self.required_bytes(width, height, capacity):
+                raise ValueError("Buffer is too small for the requested ring")
+            self.header[:] = 0
+            self.header[[WIDTH, HEIGHT, CAPACITY]] = width, height, capacity
+            self.header[MAGIC] = RING_MAGIC
+        elif self.header[MAGIC] != RING_MAGIC:
+            raise ValueError("Buffer does not hold a depth frame ring")
+
+        self.width = int(self.header[WIDTH])
+        self.height = int(self.header[HEIGHT])
+        self.capacity = int(self.header[CAPACITY])
+        # Zero-copy view of all frame slots
+        self.frames = np.ndarray((self.capacity, self.height, self.width), dtype=np.float32,
+                                 buffer=buffer, offset=HEADER_BYTES)
+
+    @staticmethod
+    def required_bytes(width, height, capacity):
+        return HEADER_BYTES + capacity * height * width * np.dtype(np.float32).itemsize
+
+    # Create a new named shared-memory ring (the creator owns and unlinks it)
+    @classmethod
+    def create_shared(cls, name, width, height, capacity):
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=cls.required_bytes(width, height, capacity))
+        return cls(shm.buf, width, height, capacity, shm=shm)
+
+    # Attach to a ring created by another process
+    @classmethod
+    def attach_shared(cls, name):
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm.buf, shm=shm)
+
+    @property
+    def frames_written(self):
+        return int(self.header[FRAMES_WRITTEN])
+
+    @property
+    def closed(self):
+        return bool(self.header[CLOSED])
+
+    # Producer side: copy one frame into the next slot and publish it
+    def publish(self, frame):
+        sequence = self.frames_written
+        self.frames[sequence % self.capacity][...] = frame
+        self.header[FRAMES_WRITTEN] = sequence + 1
+
+    # Producer side: signal that no more frames will arrive
+    def close_stream(self):
+        self.header[CLOSED] = 1
+
+    # Zero-copy view of a published frame
+    def frame_view(self, sequence):
+        return self.frames[sequence % self.capacity]
+
+    # True once the producer may have started overwriting the slot of `sequence`
+    def is_overwritten(self, sequence):
+        return self.frames_written >= sequence + self.capacity
+
+    def close(self, unlink=False):
+        # Views must be dropped before the shared memory can be closed
+        self.frames = None
+        self.header = None
+        if self._shm is not None:
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+            self._shm = None
+
+# Format comparison for a single linear eye depth frame. Sky, cleared and other
+# pixels outside [near, far] (including inf/nan) are masked out of every
+# statistic. With dtype=None it is computed directly on the (float32) frame view
+# and only the mask and per-format error arrays are allocated; pass
+# dtype="float64" to check against double precision.
+def analyze_depth_frame(frame, near, far, ssao_max=10.0, dtype=None):
+    if dtype is not None:
+        frame = frame.astype(resolve_dtype(dtype), copy=False)
+    valid = np.isfinite(frame) & (frame >= near) & (frame <= far)
+    ssao_range = valid & (frame <= ssao_max)
+    stats = {"valid fraction": float(np.mean(valid))}
+    if not np.any(valid):
+        stats.update({f"{name} mean error": np.nan for name in DEPTH_FORMATS})
+        stats["R16F win fraction"] = np.nan
+        stats["SSAO R16F win fraction"] = np.nan
+        return stats
+
+    # Invalid pixels produce inf/nan errors; they are excluded below
+    with np.errstate(invalid='ignore', over='ignore'):
+        errors = round_trip_errors(frame, far)
+    r16f_wins = errors["R16F"] < errors["R16Unorm"]
+    for name, err in errors.items():
+        stats[f"{name} mean error"] = float(np.mean(err, where=valid, dtype=np.float64))
+    stats["R16F win fraction"] = float(np.mean(r16f_wins, where=valid))
+    stats["SSAO R16F win fraction"] = (float(np.mean(r16f_wins, where=ssao_range))
+                                       if np.any(ssao_range) else np.nan)
+    return stats
+
+# Consumer: analyze frames from a ring as they arrive and publish rolling statistics
+class LiveDepthAnalyzer:
+    def __init__(self, ring, near, far, window=30, ssao_max=10.0, on_stats=None, dtype=None):
+        self.ring = ring
+        self.near = near
+        self.far = far
+        self.ssao_max = ssao_max
+        self.dtype = dtype
+        self.on_stats = on_stats
+        self.window = deque(maxlen=window)
+        self.next_sequence = 0
+        self.frames_analyzed = 0
+        self.frames_dropped = 0
+
+    # Mean of each per-frame statistic over the rolling window
+    def rolling_statistics(self):
+        if not self.window:
+            return {}
+        keys = self.window[0].keys()
+        stats = {key: float(np.nanmean([frame[key] for frame in self.window])) for key in keys}
+        stats["frames analyzed"] = self.frames_analyzed
+        stats["frames dropped"] = self.frames_dropped
+        return stats
+
+    # Analyze every frame published since the last poll; returns the number analyzed
+    def poll(self):
+        analyzed = 0
+        written = self.ring.frames_written
+        # Frames the producer has already lapped are gone
+        oldest = max(written - self.ring.capacity + 1, 0)
+        if self.next_sequence < oldest:
+            self.frames_dropped += oldest - self.next_sequence
+            self.next_sequence = oldest
+
+        while self.next_sequence < written:
+            sequence = self.next_sequence
+            self.next_sequence += 1
+            stats = analyze_depth_frame(self.ring.frame_view(sequence), self.near, self.far,
+                                        self.ssao_max, self.dtype)
+            # Discard results if the slot was rewritten while we were reading it
+            if self.ring.is_overwritten(sequence):
+                self.frames_dropped += 1
+                continue
+            self.window.append(stats)
+            self.frames_analyzed += 1
+            analyzed += 1
+            if self.on_stats is not None:
+                self.on_stats(sequence, self.rolling_statistics())
+        return analyzed
+
+    # Poll until the producer closes the stream (or the timeout expires)
+    def run(self, poll_interval=0.001, timeout=None):
+        start = time.perf_counter()
+        while True:
+            closed = self.ring.closed
+            if self.poll() == 0:
+                if closed:
+                    break
+                if timeout is not None and time.perf_counter() - start > timeout:
+                    break
+                time.sleep(poll_interval)
+        return self.rolling_statistics()
+
+# Stand-in for the renderer: publish synthetic frames with a wall moving away from the camera
+def synthetic_producer(name, n_frames, near, far, fps=60.0):
+    ring = DepthFrameRing.attach_shared(name)
+    fov_y = np.radians(60.0)
+    aspect = ring.width / ring.height
+    wall_distances = np.linspace(1.0, 40.0, n_frames)
+    for wall_distance in wall_distances:
+        frame = synthetic_eye_depth_frames(ring.width, ring.height, near, far, fov_y, aspect,
+                                           wall_distances=(wall_distance,))[0]
+        ring.publish(frame)
+        time.sleep(1.0 / fps)
+    ring.close_stream()
+    ring.close()
+
+# End-to-end check with a local producer process: every published frame is either
+# analyzed or counted as dropped, the segment is gone after close(unlink=True),
+# and invalid pixels do not leak into the statistics
+def run_checks(n_frames=200, width=64, height=32, capacity=4):
+    near, far = 0.1, 1000.0
+
+    # First a producer that outruns a slow consumer, so frames get lapped and
+    # dropped, then one the consumer keeps up with
+    for fps, poll_interval in [(2000.0, 0.02), (200.0, 0.001)]:
+        name = f"r16f_depth_ring_check_{os.getpid()}"
+        ring = DepthFrameRing.create_shared(name, width, height, capacity)
+        analyzer = LiveDepthAnalyzer(ring, near, far)
+        producer = Process(target=synthetic_producer, args=(name, n_frames, near, far, fps))
+        try:
+            producer.start()
+            analyzer.run(poll_interval=poll_interval, timeout=60.0)
+            producer.join()
+            assert ring.closed, "producer did not close the stream"
+        finally:
+            ring.close(unlink=True)
+        assert producer.exitcode == 0, f"producer exited with {producer.exitcode}"
+        assert analyzer.frames_analyzed + analyzer.frames_dropped == n_frames, \
+            (analyzer.frames_analyzed, analyzer.frames_dropped, n_frames)
+        try:
+            DepthFrameRing.attach_shared(name)
+        except FileNotFoundError:
+            pass
+        else:
+            raise AssertionError(f"Shared memory '{name}' still exists after unlink")
+        print(f"Producer at {fps:g} fps: {analyzer.frames_analyzed} analyzed + "
+              f"{analyzer.frames_dropped} dropped = {n_frames} frames")
+
+    # Sky (inf), cleared (0, nan) and over-far pixels are masked out
+    frame = np.full((height, width), 5.0, dtype=np.float32)
+    clean = analyze_depth_frame(frame, near, far)
+    frame[0, :] = np.inf
+    frame[1, :] = np.nan
+    frame[2, :] = 0.0
+    frame[3, :] = 2 * far
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        masked = analyze_depth_frame(frame, near, far)
+    for key, value in clean.items():
+        if key != "valid fraction":
+            assert masked[key] == value, (key, masked[key], value)
+    assert masked["valid fraction"] == (height - 4) / height
+    print("Invalid pixels are excluded from the statistics")
+
+def main():
+    parser = argparse.ArgumentParser(description='Live R16F/R16Unorm statistics from a shared-memory depth ring')
+    parser.add_argument('--dtype', choices=sorted(COMPUTE_DTYPES),
+                        help='Compute dtype (default: the float32 frames as stored)')
+    parser.add_argument('--check', action='store_true',
+                        help='Run the local producer checks instead of the demo')
+    args = parser.parse_args()
+    if args.check:
+        run_checks()
+        return
+
+    near = 0.1  # 10cm
+    far = 1000.0
+    width, height, capacity = 640, 360, 8
+    n_frames = 120
+    # Unique per run, so a segment left behind by a crashed run does not collide
+    name = f"r16f_depth_ring_{os.getpid()}"
+
+    ring = DepthFrameRing.create_shared(name, width, height, capacity)
+    print(f"Shared-memory ring '{name}': {capacity} x {width}x{height} float32 frames "
+          f"({DepthFrameRing.required_bytes(width, height, capacity)} bytes)")
+
+    def report(sequence, stats):
+        if sequence % 20 == 0:
+            print(f"Frame {sequence:>4}: "
+                  f"R16F mean error {stats['R16F mean error']:.3e}m, "
+                  f"R16Unorm mean error {stats['R16Unorm mean error']:.3e}m, "
+                  f"SSAO R16F wins {100 * stats['SSAO R16F win fraction']:.1f}%")
+
+    analyzer = LiveDepthAnalyzer(ring, near, far, on_stats=report, dtype=args.dtype)
+    producer = Process(target=synthetic_producer, args=(name, n_frames, near, far))
+    try:
+        producer.start()
+        stats = analyzer.run(timeout=60.0)
+        producer.join()
+    finally:
+        ring.close(unlink=True)
+
+    print("\nRolling statistics over the last frames:")
+    for key, value in stats.items():
+        print(f"  {key}: {value:.6g}")
+
+if __name__ == "__main__":
+    main()
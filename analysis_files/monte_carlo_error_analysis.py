@@ -0,0 +1,216 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analysis_params import parse_args
+from precision_kernels import DEPTH_FORMATS, linear_eye_z, resolve_dtype, round_trip_errors
+
+# Realistic depth distributions to sample eye space z from
+DEPTH_DISTRIBUTIONS = {
+    "eye": "uniform in eye space",
+    "ndc": "uniform in NDC",
+    "log": "log-uniform in eye space",
+}
+
+# Fixed log-spaced error histogram bins (meters) so partial results merge exactly.
+# Bin 0 is [0, 1e-12) and collects exact round trips along with any error below
+# 1e-12m; relative bin width is about 1.7%.
+ERROR_BIN_EDGES = np.concatenate([[0.0], np.logspace(-12, 3, 2001)])
+
+Z_95 = 1.959963984540054  # two-sided 95% normal quantile
+
+# Draw eye space z samples for one depth distribution, computed in the given dtype
+def sample_eye_z(rng, distribution, near, far, size, dtype=np.float64):
+    dtype = resolve_dtype(dtype)
+    u = rng.random(size, dtype=dtype)
+    near, far = dtype.type(near), dtype.type(far)
+    if distribution == "eye":
+        # Uniform in eye space
+        return near + (far - near) * u
+    if distribution == "ndc":
+        # Uniform in reversed-Z NDC, i.e. uniform over the depth buffer
+        return linear_eye_z(u, near, far, dtype)
+    if distribution == "log":
+        # Log-uniform between near and far
+        return np.exp(np.log(near) + (np.log(far) - np.log(near)) * u)
+    raise ValueError(f"Unknown depth distribution: {distribution}")
+
+# Mergeable partial result for one chunk of samples
+def empty_partial():
+    return {
+        "count": 0,
+        "sum": {name: 0.0 for name in DEPTH_FORMATS},
+        "sum_sq": {name: 0.0 for name in DEPTH_FORMATS},
+        "histogram": {name: np.zeros(len(ERROR_BIN_EDGES) - 1, dtype=np.int64)
+                      for name in DEPTH_FORMATS},
+        "r16f_wins": 0,
+        "ties": 0,
+    }
+
+# Worker entry point: evaluate one chunk with its own independent random stream
+def simulate_chunk(task):
+    seed_sequence, distribution, near, far, size, dtype = task
+    rng = np.random.default_rng(seed_sequence)
+    eye_z = sample_eye_z(rng, distribution, near, far, size, dtype)
+    errors = round_trip_errors(eye_z, far)
+
+    partial = empty_partial()
+    partial["count"] = size
+    for name, err in errors.items():
+        partial["sum"][name] = float(np.sum(err, dtype=np.float64))
+        partial["sum_sq"][name] = float(np.sum(err * err, dtype=np.float64))
+        clipped = np.clip(err, 0.0, ERROR_BIN_EDGES[-1])
+        partial["histogram"][name] = np.histogram(clipped, bins=ERROR_BIN_EDGES)[0]
+    partial["r16f_wins"] = int(np.sum(errors["R16F"] < errors["R16Unorm"]))
+    partial["ties"] = int(np.sum(errors["R16F"] == errors["R16Unorm"]))
+    return partial
+
+# Fold partial results together; callers pass them in chunk order so the
+# floating point sums do not depend on worker scheduling
+def merge_partials(partials):
+    merged = empty_partial()
+    for partial in partials:
+        merged["count"] += partial["count"]
+        merged["r16f_wins"] += partial["r16f_wins"]
+        merged["ties"] += partial["ties"]
+        for name in DEPTH_FORMATS:
+            merged["sum"][name] += partial["sum"][name]
+            merged["sum_sq"][name] += partial["sum_sq"][name]
+            merged["histogram"][name] += partial["histogram"][name]
+    return merged
+
+# Histogram bin holding a given (fractional) rank
+def histogram_bin(histogram, rank):
+    cdf = np.cumsum(histogram)
+    rank = min(max(rank, 0.0), cdf[-1] - 1)
+    return int(np.searchsorted(cdf, rank, side='right'))
+
+# Representative value of a histogram bin: the geometric center of the log-spaced
+# bins, or 0 for the exact round-trip bin
+def bin_center(idx):
+    if idx == 0:
+        return 0.0
+    return float(np.sqrt(ERROR_BIN_EDGES[idx] * ERROR_BIN_EDGES[idx + 1]))
+
+# Percentile estimate with a distribution-free (order statistic) 95% confidence
+# interval. The interval runs from the lower edge of the bin holding the lower
+# rank to the upper edge of the bin holding the upper rank, so it also covers
+# the binning error.
+def percentile_interval(histogram, q):
+    n = int(np.sum(histogram))
+    p = q / 100.0
+    half_width = Z_95 * np.sqrt(n * p * (1.0 - p))
+    lo_bin = histogram_bin(histogram, np.floor(n * p - half_width))
+    hi_bin = histogram_bin(histogram, np.ceil(n * p + half_width))
+    return (bin_center(histogram_bin(histogram, n * p)),
+            float(ERROR_BIN_EDGES[lo_bin]),
+            float(ERROR_BIN_EDGES[hi_bin + 1]))
+
+# Turn merged sums into estimates with 95% confidence intervals
+def summarize(merged, percentiles=(50, 95, 99)):
+    n = merged["count"]
+    summary = {"count": n, "formats": {}}
+    for name in DEPTH_FORMATS:
+        mean = merged["sum"][name] / n
+        variance = max(merged["sum_sq"][name] / n - mean * mean, 0.0) * n / max(n - 1, 1)
+        half_width = Z_95 * np.sqrt(variance / n)
+        summary["formats"][name] = {
+            "mean": (mean, float(mean - half_width), float(mean + half_width)),
+            "percentiles": {q: percentile_interval(merged["histogram"][name], q)
+                            for q in percentiles},
+        }
+
+    # Wilson score interval for the probability that R16F has the smaller error
+    p = merged["r16f_wins"] / n
+    denom = 1.0 + Z_95 ** 2 / n
+    center = (p + Z_95 ** 2 / (2 * n)) / denom
+    spread = Z_95 * np.sqrt(p * (1.0 - p) / n + Z_95 ** 2 / (4 * n * n)) / denom
+    summary["r16f_win_probability"] = (p, float(center - spread), float(center + spread))
+    summary["tie_probability"] = merged["ties"] / n
+    return summary
+
+# Seeded chunk tasks for one case. Samples are split into fixed-size chunks,
+# each with its own child of the case's SeedSequence, so results do not depend
+# on how the chunks are scheduled across worker processes.
+def case_tasks(near, far, distribution, n_samples, seed_sequence, chunk_size, dtype):
+    n_chunks = (n_samples + chunk_size - 1) // chunk_size
+    children = seed_sequence.spawn(n_chunks)
+    return [(child, distribution, near, far,
+             min(chunk_size, n_samples - i * chunk_size), resolve_dtype(dtype))
+            for i, child in enumerate(children)]
+
+# Run the Monte Carlo estimate for many (near, far, distribution) cases at once.
+# Each case gets its own child of the seed, so cases draw independent streams.
+# The chunks of every case are submitted together so all workers stay busy, and
+# each case is merged in chunk order, so results are identical for any number
+# of worker processes. dtype selects float32 or float64 sampling and error
+# arithmetic; sums are merged in float64.
+def run_monte_carlo_cases(cases, n_samples, seed=0, chunk_size=1_000_000,
+                          workers=None, executor=None, dtype=np.float64):
+    case_seeds = np.random.SeedSequence(seed).spawn(len(cases))
+    task_lists = [case_tasks(near, far, distribution, n_samples, case_seed, chunk_size, dtype)
+                  for (near, far, distribution), case_seed in zip(cases, case_seeds)]
+    tasks = [task for task_list in task_lists for task in task_list]
+
+    if executor is not None:
+        partials = list(executor.map(simulate_chunk, tasks))
+    elif workers == 1:
+        partials = [simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(simulate_chunk, tasks))
+
+    summaries = []
+    start = 0
+    for task_list in task_lists:
+        summaries.append(summarize(merge_partials(partials[start:start + len(task_list)])))
+        start += len(task_list)
+    return summaries
+
+# Run the Monte Carlo estimate for one (near, far) pair and depth distribution
+def run_monte_carlo(near, far, distribution, n_samples, seed=0,
+                    chunk_size=1_000_000, workers=None, executor=None, dtype=np.float64):
+    return run_monte_carlo_cases([(near, far, distribution)], n_samples, seed, chunk_size,
+                                 workers, executor, dtype)[0]
+
+def main():
+    # Near/far planes and compute dtype come from analysis_params.json (or --dtype)
+    params = parse_args('Parallel Monte Carlo round-trip error estimates')
+    near = params["near"]
+    far_values = params["far_values"]
+    dtype = params["dtype"]
+    n_samples = 8_000_000
+    seed = 2024
+    workers = os.cpu_count()
+
+    print(f"Monte Carlo round-trip error: {n_samples} samples per case, "
+          f"{workers} worker processes, seed={seed}, {dtype}")
+
+    start = time.perf_counter()
+    cases = [(near, far, distribution)
+             for distribution in DEPTH_DISTRIBUTIONS for far in far_values]
+    summaries = iter(run_monte_carlo_cases(cases, n_samples, seed, workers=workers, dtype=dtype))
+
+    for distribution, description in DEPTH_DISTRIBUTIONS.items():
+        print(f"\n--- Depth distribution: {description} ---")
+        print(f"{'Far':<8} {'Format':<10} {'Mean error (m) [95% CI]':<40} "
+              f"{'P95 error (m) [95% CI]':<40}")
+        print("-" * 98)
+        for far in far_values:
+            summary = next(summaries)
+            for name, stats in summary["formats"].items():
+                mean, mean_lo, mean_hi = stats["mean"]
+                p95, p95_lo, p95_hi = stats["percentiles"][95]
+                print(f"{far:<8.0f} {name:<10} "
+                      f"{f'{mean:.3e} [{mean_lo:.3e}, {mean_hi:.3e}]':<40} "
+                      f"{f'{p95:.3e} [{p95_lo:.3e}, {p95_hi:.3e}]':<40}")
+            p, p_lo, p_hi = summary["r16f_win_probability"]
+            print(f"{'':<8} P(R16F wins) = {p:.4f} [{p_lo:.4f}, {p_hi:.4f}], "
+                  f"P(tie) = {summary['tie_probability']:.4f}")
+
+    print(f"\nTotal time: {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import numpy as np
+
+from analysis_params import parse_args
+from precision_kernels import DEPTH_FORMATS, resolve_dtype
+
+# Pixel-center UV grid for a width x height frame, shape (height, width, 2)
+def uv_grid(width, height, dtype=np.float64):
+    u = (np.arange(width) + 0.5) / width
+    v = (np.arange(height) + 0.5) / height
+    uu, vv = np.meshgrid(u, v)
+    return np.stack([uu, vv], axis=-1).astype(resolve_dtype(dtype), copy=False)
+
+# Reconstruct view-space positions from UV and linear eye depth
+# uv: (H, W, 2), eye_z: (..., H, W) -> positions: (..., H, W, 3), in the dtype of eye_z
+def reconstruct_view_positions(uv, eye_z, fov_y, aspect):
+    tan_half_fov = eye_z.dtype.type(np.tan(0.5 * fov_y))
+    ndc_x = uv[..., 0] * 2.0 - 1.0
+    ndc_y = 1.0 - uv[..., 1] * 2.0  # v grows downwards, view-space y grows upwards
+    x = ndc_x * tan_half_fov * aspect * eye_z
+    y = ndc_y * tan_half_fov * eye_z
+    return np.stack([x, y, eye_z], axis=-1)
+
+# Reconstruct normals from view-space positions with central finite differences
+# positions: (..., H, W, 3) -> unit normals: (..., H, W, 3)
+def reconstruct_normals(positions):
+    ddx = np.gradient(positions, axis=-2)
+    ddy = np.gradient(positions, axis=-3)
+    normals = np.cross(ddy, ddx)
+    length = np.linalg.norm(normals, axis=-1, keepdims=True)
+    return normals / np.maximum(length, 1e-30)
+
+# Angle in degrees between two sets of unit normals
+def angular_error(reference_normals, test_normals):
+    cos_angle = np.clip(np.sum(reference_normals * test_normals, axis=-1), -1.0, 1.0)
+    return np.degrees(np.arccos(cos_angle))
+
+# Build a batch of linear eye depth frames for a simple SSAO-style test scene:
+# a ground plane under the camera and a back wall at each of the given distances.
+def synthetic_eye_depth_frames(width, height, near, far, fov_y, aspect,
+                               wall_distances=(2.0, 5.0, 10.0, 30.0), camera_height=1.5):
+    uv = uv_grid(width, height)
+    # Ray directions with z = 1, so the ray parameter equals eye space z
+    dir_y = (1.0 - uv[..., 1] * 2.0) * np.tan(0.5 * fov_y)
+    with np.errstate(divide='ignore'):
+        ground_z = np.where(dir_y < 0.0, -camera_height / dir_y, np.inf)
+    walls = np.asarray(wall_distances, dtype=np.float64)[:, None, None]
+    eye_z = np.minimum(ground_z[None, :, :], walls)
+    return np.clip(eye_z, near, far)
+
+# Quantize eye depth frames through every format and measure normal error
+# eye_z_frames: (B, H, W) -> {format: (B, H, W) angular error in degrees},
+# computed in the dtype of eye_z_frames (float32 or float64)
+def normal_error_maps(eye_z_frames, far, fov_y, aspect, formats=DEPTH_FORMATS):
+    height, width = eye_z_frames.shape[-2:]
+    uv = uv_grid(width, height, eye_z_frames.dtype)
+    reference_normals = reconstruct_normals(
+        reconstruct_view_positions(uv, eye_z_frames, fov_y, aspect))
+
+    error_maps = {}
+    for name, quantize in formats.items():
+        # Stored as normalized_eye_z = eye_z / far, decoded as normalized_eye_z * far
+        decoded_eye_z = quantize(eye_z_frames / far) * far
+        normals = reconstruct_normals(
+            reconstruct_view_positions(uv, decoded_eye_z, fov_y, aspect))
+        error_maps[name] = angular_error(reference_normals, normals)
+    return error_maps
+
+# Summary statistics of an error map, optionally restricted by a boolean mask
+def error_statistics(error_map, mask=None):
+    values = error_map[mask] if mask is not None else error_map.ravel()
+    if values.size == 0:
+        return {"mean": np.nan, "p50": np.nan, "p95": np.nan, "p99": np.nan, "max": np.nan}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "mean": float(np.mean(values)),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(np.max(values)),
+    }
+
+def main():
+    # Imported here so live_depth_ingest can reuse the frame helpers without pyplot
+    import matplotlib.pyplot as plt
+
+    # Near/far planes, SSAO range and compute dtype come from analysis_params.json
+    params = parse_args('Normal reconstruction error from quantized depth')
+    near = params["near"]
+    far_values = params["far_values"]
+    ssao_max = params["ssao_max"]
+    dtype = resolve_dtype(params["dtype"])
+    width, height = 640, 360
+    fov_y = np.radians(60.0)
+    aspect = width / height
+    wall_distances = (2.0, 5.0, 10.0, 30.0)
+
+    eye_z_frames = synthetic_eye_depth_frames(width, height, near, max(far_values), fov_y, aspect,
+                                              wall_distances).astype(dtype)
+    # Skip the one-pixel border where gradients are one-sided
+    ssao_mask = eye_z_frames <= ssao_max
+    ssao_mask[:, [0, -1], :] = False
+    ssao_mask[:, :, [0, -1]] = False
+
+    print(f"Normal reconstruction error in SSAO-relevant range (0-{ssao_max:g}m), {dtype} compute, degrees:")
+    print(f"{'Far':<8} {'Format':<10} {'Mean':<10} {'P50':<10} {'P95':<10} {'P99':<10} {'Max':<10}")
+    print("-" * 68)
+
+    plt.figure(figsize=(15, 4 * len(far_values)))
+    for i, far in enumerate(far_values):
+        frames = np.clip(eye_z_frames, near, far)
+        error_maps = normal_error_maps(frames, far, fov_y, aspect)
+
+        for name, error_map in error_maps.items():
+            stats = error_statistics(error_map, ssao_mask)
+            print(f"{far:<8.0f} {name:<10} {stats['mean']:<10.4f} {stats['p50']:<10.4f} "
+                  f"{stats['p95']:<10.4f} {stats['p99']:<10.4f} {stats['max']:<10.4f}")
+
+        # Show the frame with the 10m wall, where the ground plane covers the SSAO range
+        frame_index = wall_distances.index(10.0)
+        vmax = max(np.percentile(error_maps[name][frame_index], 99) for name in error_maps)
+
+        plt.subplot(len(far_values), 3, i * 3 + 1)
+        plt.imshow(frames[frame_index], cmap='viridis')
+        plt.colorbar(label='Eye Space Z (m)')
+        plt.title(f'Linear Eye Z (Far={far}m)')
+        plt.axis('off')
+
+        for j, name in enumerate(error_maps):
+            plt.subplot(len(far_values), 3, i * 3 + 2 + j)
+            plt.imshow(error_maps[name][frame_index], cmap='magma', vmin=0.0, vmax=vmax)
+            plt.colorbar(label='Normal Error (degrees)')
+            plt.title(f'{name} Normal Error (Far={far}m)')
+            plt.axis('off')
+
+    plt.tight_layout()
+    plt.savefig('normal_reconstruction_error.png', dpi=150)
+    print("\nChart saved as 'normal_reconstruction_error.png'")
+
+if __name__ == "__main__":
+    main()
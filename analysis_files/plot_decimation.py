@@ -0,0 +1,146 @@
+import io
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Default cap on points drawn per series; a 12-inch wide figure at 150 dpi is
+# 1800 pixels, so this keeps about one min/max pair per horizontal pixel
+DEFAULT_MAX_POINTS = 4000
+
+# Map data to display-proportional coordinates for an axis scale
+def _to_display(values, scale):
+    if scale == 'log':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log10(values)
+    if scale == 'linear':
+        return values
+    raise ValueError(f"Unsupported axis scale: {scale}")
+
+# Finite, x-ascending copy of a series plus a flag to restore the original order
+def _prepare_series(x, y, xscale, yscale):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError("x and y must be 1-D arrays of the same length")
+    keep = np.isfinite(_to_display(x, xscale)) & np.isfinite(_to_display(y, yscale))
+    x, y = x[keep], y[keep]
+    reversed_order = len(x) > 1 and x[0] > x[-1]
+    if reversed_order:
+        x, y = x[::-1], y[::-1]
+    if np.any(np.diff(x) < 0):
+        raise ValueError("x must be monotonic to be decimated")
+    return x, y, reversed_order
+
+def _restore_order(x, y, reversed_order):
+    return (x[::-1], y[::-1]) if reversed_order else (x, y)
+
+# Min/max-per-bucket decimation: split the x range into equal display-space
+# buckets (about one per pixel) and keep the lowest and highest point of each.
+# Step discontinuities, such as R16F binade edges, keep both levels.
+def minmax_decimate(x, y, max_points=DEFAULT_MAX_POINTS, xscale='linear', yscale='linear'):
+    x, y, reversed_order = _prepare_series(x, y, xscale, yscale)
+    if len(x) <= max_points:
+        return _restore_order(x, y, reversed_order)
+
+    n_buckets = max((max_points - 2) // 2, 1)
+    xd = _to_display(x, xscale)
+    edges = np.linspace(xd[0], xd[-1], n_buckets + 1)
+
+    # x is ascending, so every bucket is a contiguous run found by searching the
+    # edges in x (not x in the edges); reduce each non-empty run to its min and
+    # max in one linear pass (first minimum, last maximum on ties)
+    bounds = np.r_[0, np.searchsorted(xd, edges[1:-1], side='left'), len(x)]
+    starts = bounds[:-1][bounds[:-1] < bounds[1:]]
+    counts = np.diff(np.r_[starts, len(x)])
+    run = np.repeat(np.arange(len(starts)), counts)
+    is_min = np.flatnonzero(y == np.repeat(np.minimum.reduceat(y, starts), counts))
+    is_max = np.flatnonzero(y == np.repeat(np.maximum.reduceat(y, starts), counts))
+    mins = is_min[np.r_[True, run[is_min][1:] != run[is_min][:-1]]]
+    maxs = is_max[np.r_[run[is_max][1:] != run[is_max][:-1], True]]
+
+    keep = np.unique(np.concatenate([[0, len(x) - 1], mins, maxs]))
+    return _restore_order(x[keep], y[keep], reversed_order)
+
+# Largest-Triangle-Three-Buckets decimation, computed in display space
+def lttb_decimate(x, y, max_points=DEFAULT_MAX_POINTS, xscale='linear', yscale='linear'):
+    x, y, reversed_order = _prepare_series(x, y, xscale, yscale)
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return _restore_order(x, y, reversed_order)
+
+    xd = _to_display(x, xscale)
+    yd = _to_display(y, yscale)
+    # Bucket boundaries over the interior points; first and last points are always kept
+    bounds = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        if i + 2 < len(bounds):
+            next_lo, next_hi = bounds[i + 1], bounds[i + 2]
+            cx, cy = xd[next_lo:next_hi].mean(), yd[next_lo:next_hi].mean()
+        else:
+            cx, cy = xd[-1], yd[-1]
+        area = np.abs((xd[a] - cx) * (yd[lo:hi] - yd[a]) - (xd[a] - xd[lo:hi]) * (cy - yd[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return _restore_order(x[keep], y[keep], reversed_order)
+
+DECIMATION_METHODS = {
+    "minmax": minmax_decimate,
+    "lttb": lttb_decimate,
+}
+
+# Reduce a series before handing it to plt.plot / loglog / semilogx / semilogy
+def decimate(x, y, max_points=DEFAULT_MAX_POINTS, xscale='linear', yscale='linear',
+             method='minmax'):
+    try:
+        decimate_series = DECIMATION_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown decimation method: {method}") from None
+    return decimate_series(x, y, max_points, xscale, yscale)
+
+# Time the whole path for one series: decimation (none for "full"), the plot call
+# and rendering with savefig
+def time_plot_path(x, y, method=None):
+    start = time.perf_counter()
+    xs, ys = (x, y) if method is None else decimate(x, y, xscale='log', yscale='log', method=method)
+    decimated = time.perf_counter()
+    fig = plt.figure(figsize=(12, 4))
+    plt.loglog(xs, ys, 'b-')
+    fig.savefig(io.BytesIO(), format='png', dpi=150)
+    plt.close(fig)
+    done = time.perf_counter()
+    return len(xs), decimated - start, done - decimated, done - start
+
+def main():
+    from precision_kernels import fp16_precision
+
+    print("Comparing end-to-end time (decimate + plot + savefig) of full and decimated curves...")
+    rng = np.random.default_rng(0)
+    for n_points in [100_000, 1_000_000, 5_000_000]:
+        start = time.perf_counter()
+        x_values = np.logspace(-8, 0, n_points)
+        fp16_prec = fp16_precision(x_values)
+        compute = time.perf_counter() - start
+        # The step curve is mostly collinear runs, which matplotlib's path
+        # simplification already drops; noisy data (e.g. sampled errors) is not
+        series = {
+            "R16F step": fp16_prec,
+            "noisy": fp16_prec * (1.0 + 0.5 * rng.random(n_points)),
+        }
+
+        print(f"\n{n_points} samples (computing x and the R16F step: {compute:.3f}s):")
+        print(f"  {'Series':<10} {'Method':<8} {'Points':>8} {'Decimate':>9} {'Draw':>7} {'Total':>7}")
+        for name, y_values in series.items():
+            for method in [None, "minmax", "lttb"]:
+                count, decimate_s, draw_s, total_s = time_plot_path(x_values, y_values, method)
+                print(f"  {name:<10} {method or 'full':<8} {count:>8} {decimate_s:>8.3f}s "
+                      f"{draw_s:>6.3f}s {total_s:>6.3f}s")
+
+if __name__ == "__main__":
+    main()
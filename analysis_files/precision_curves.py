@@ -0,0 +1,198 @@
+import numpy as np
+
+# Piecewise-constant curve: values[i] holds on [breakpoints[i], breakpoints[i+1]).
+# Precision steps are constant per binade (R16F) or everywhere (R16Unorm), so a
+# few dozen segments represent them exactly instead of dense sample arrays.
+class PiecewiseConstantCurve:
+    def __init__(self, breakpoints, values):
+        self.breakpoints = np.asarray(breakpoints, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        if self.breakpoints.ndim != 1 or len(self.breakpoints) != len(self.values) + 1:
+            raise ValueError("Need exactly one more breakpoint than values")
+        if np.any(np.diff(self.breakpoints) <= 0):
+            raise ValueError("Breakpoints must be strictly increasing")
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return (f"PiecewiseConstantCurve({len(self)} segments on "
+                f"[{self.breakpoints[0]:g}, {self.breakpoints[-1]:g}])")
+
+    @property
+    def domain(self):
+        return self.breakpoints[0], self.breakpoints[-1]
+
+    @property
+    def nbytes(self):
+        return self.breakpoints.nbytes + self.values.nbytes
+
+    # Exact evaluation; the last breakpoint belongs to the last segment, NaN outside the domain
+    def __call__(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        idx = np.searchsorted(self.breakpoints, x, side='right') - 1
+        idx = np.clip(idx, 0, len(self) - 1)
+        inside = (x >= self.breakpoints[0]) & (x <= self.breakpoints[-1])
+        return np.where(inside, self.values[idx], np.nan)
+
+    # Restrict the curve to [lo, hi]
+    def clip(self, lo, hi):
+        lo = max(lo, self.breakpoints[0])
+        hi = min(hi, self.breakpoints[-1])
+        if lo >= hi:
+            raise ValueError("Clip range does not overlap the curve domain")
+        inner = self.breakpoints[(self.breakpoints > lo) & (self.breakpoints < hi)]
+        breakpoints = np.concatenate([[lo], inner, [hi]])
+        return PiecewiseConstantCurve(breakpoints, self(breakpoints[:-1]))
+
+    # Collapse neighbouring segments that hold the same value
+    def simplify(self):
+        keep = np.concatenate([[True], self.values[1:] != self.values[:-1]])
+        breakpoints = np.concatenate([self.breakpoints[:-1][keep], [self.breakpoints[-1]]])
+        return PiecewiseConstantCurve(breakpoints, self.values[keep])
+
+    # Combine two curves point-wise (e.g. np.divide for a precision ratio) on their common domain
+    def combine(self, other, op):
+        lo = max(self.breakpoints[0], other.breakpoints[0])
+        hi = min(self.breakpoints[-1], other.breakpoints[-1])
+        if lo >= hi:
+            raise ValueError("Curves have no overlapping domain")
+        breakpoints = np.union1d(self.breakpoints, other.breakpoints)
+        breakpoints = breakpoints[(breakpoints >= lo) & (breakpoints <= hi)]
+        left = breakpoints[:-1]
+        return PiecewiseConstantCurve(breakpoints, op(self(left), other(left))).simplify()
+
+    # Exact integral over [a, b] (defaults to the whole domain)
+    def integrate(self, a=None, b=None):
+        lo, hi = self.domain
+        a = lo if a is None else max(a, lo)
+        b = hi if b is None else min(b, hi)
+        if a >= b:
+            return 0.0
+        widths = np.clip(self.breakpoints[1:], a, b) - np.clip(self.breakpoints[:-1], a, b)
+        return float(np.sum(widths * self.values))
+
+    # Merged [start, end) intervals where predicate(values) holds
+    def intervals_where(self, predicate):
+        mask = np.asarray(predicate(self.values), dtype=bool)
+        intervals = []
+        for i in np.flatnonzero(mask):
+            start, end = self.breakpoints[i], self.breakpoints[i + 1]
+            if intervals and intervals[-1][1] == start:
+                intervals[-1] = (intervals[-1][0], end)
+            else:
+                intervals.append((start, end))
+        return intervals
+
+    # Total length of the domain where predicate(values) holds
+    def measure_where(self, predicate):
+        return float(sum(end - start for start, end in self.intervals_where(predicate)))
+
+    # Positions where the curve crosses a level (above <-> at-or-below)
+    def crossings(self, level):
+        above = self.values > level
+        return self.breakpoints[1:-1][above[1:] != above[:-1]]
+
+    # Positions where this curve and another one swap order
+    def intersections(self, other):
+        return self.combine(other, np.subtract).crossings(0.0)
+
+    # Render as a step plot; works with log axes since only segment edges are drawn
+    def plot(self, ax=None, **kwargs):
+        if ax is None:
+            # Imported here so the curve math does not load pyplot
+            import matplotlib.pyplot as plt
+            ax = plt.gca()
+        return ax.stairs(self.values, self.breakpoints, **kwargs)
+
+# Exact R16F precision step curve on [lo, hi] (one segment per binade)
+def fp16_precision_curve(lo=0.0, hi=1.0):
+    # Subnormals [0, 2^-14) share the smallest step 2^-24
+    first_exponent = -14
+    last_exponent = int(np.floor(np.log2(hi)))
+    edges = 2.0 ** np.arange(first_exponent, last_exponent + 1)
+    breakpoints = np.concatenate([[0.0], edges, [2.0 ** (last_exponent + 1)]])
+    values = np.concatenate([[2.0 ** -24], 2.0 ** (np.arange(first_exponent, last_exponent + 1) - 10)])
+    return PiecewiseConstantCurve(breakpoints, values).clip(lo, hi)
+
+# Exact R16Unorm precision step curve on [lo, hi] (a single segment)
+def unorm16_precision_curve(lo=0.0, hi=1.0):
+    return PiecewiseConstantCurve([lo, hi], [1 / 65535.0])
+
+# Precision ratio (Unorm16 step / FP16 step, >1 means FP16 is better)
+def precision_ratio_curve(lo=0.0, hi=1.0):
+    return unorm16_precision_curve(lo, hi).combine(fp16_precision_curve(lo, hi), np.divide)
+
+# Reversed-Z NDC for a given linear eye z (inverse of linear_eye_z)
+def eye_z_to_ndc(eye_z, near, far):
+    return (near * far / np.asarray(eye_z, dtype=np.float64) - near) / (far - near)
+
+# Exact crossover points in eye space, with depth stored as normalized_eye_z = eye_z / far
+def eye_space_crossovers(near, far):
+    ratio = precision_ratio_curve(near / far, 1.0)
+    return ratio.crossings(1.0) * far
+
+# Exact share of the SSAO-relevant range (near..ssao_max in eye space) where R16F is
+# more precise, weighted uniformly in NDC like the sampled analysis in eye_depth_analysis.py
+def ssao_r16f_percentage(near, far, ssao_max=10.0):
+    ssao_max = min(ssao_max, far)
+    ratio = precision_ratio_curve(near / far, ssao_max / far)
+    r16f_ndc = 0.0
+    for start, end in ratio.intervals_where(lambda r: r > 1):
+        r16f_ndc += eye_z_to_ndc(start * far, near, far) - eye_z_to_ndc(end * far, near, far)
+    total_ndc = eye_z_to_ndc(near, near, far) - eye_z_to_ndc(ssao_max, near, far)
+    return 100.0 * r16f_ndc / total_ndc
+
+def main():
+    import matplotlib.pyplot as plt
+
+    near = 0.1  # 10cm
+    far_values = [50.0, 100.0, 200.0, 1000.0]
+
+    fp16_curve = fp16_precision_curve(1e-8, 1.0)
+    unorm16_curve = unorm16_precision_curve(1e-8, 1.0)
+    ratio_curve = unorm16_curve.combine(fp16_curve, np.divide)
+
+    dense_bytes = 3 * np.logspace(-8, 0, 1000).nbytes
+    print(f"R16F curve: {fp16_curve}")
+    print(f"Curve storage: {fp16_curve.nbytes + unorm16_curve.nbytes + ratio_curve.nbytes} bytes "
+          f"(dense 1000-sample arrays: {dense_bytes} bytes)")
+    print(f"Precision crossover points: "
+          f"{', '.join(f'{x:.8f}' for x in fp16_curve.intersections(unorm16_curve))}")
+    print(f"Integral of R16F step on [1e-8, 1]: {fp16_curve.integrate():.10f}")
+
+    print("\nExact SSAO-relevant range (0-10m) analysis:")
+    print(f"{'Far Plane':<12} {'R16F Better':<14} {'R16Unorm Better':<18} {'Crossover (eye space)'}")
+    print("-" * 68)
+    for far in far_values:
+        r16f_percentage = ssao_r16f_percentage(near, far)
+        crossovers = ', '.join(f'{z:.3f}m' for z in eye_space_crossovers(near, far))
+        print(f"{far:<12.0f} {r16f_percentage:<14.1f} {100 - r16f_percentage:<18.1f} {crossovers}")
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
+    fp16_curve.plot(ax1, color='b', label='R16F Precision')
+    unorm16_curve.plot(ax1, color='r', label='R16Unorm Precision')
+    ax1.set_xscale('log')
+    ax1.set_yscale('log')
+    ax1.grid(True, which="both", ls="-")
+    ax1.set_ylabel('Precision Step (smaller is better)')
+    ax1.set_title(f'R16F vs R16Unorm Precision Step ({len(fp16_curve)} exact segments)')
+    ax1.legend()
+
+    ratio_curve.plot(ax2, color='g')
+    ax2.axhline(y=1, color='k', linestyle='--')
+    for x in ratio_curve.crossings(1.0):
+        ax2.axvline(x=x, color='r', linestyle='--', alpha=0.5)
+    ax2.set_xscale('log')
+    ax2.set_yscale('log')
+    ax2.grid(True, which="both", ls="-")
+    ax2.set_xlabel('Depth Value')
+    ax2.set_ylabel('Precision Ratio (R16Unorm step / R16F step)')
+    ax2.set_title('Precision Ratio: Values > 1 indicate R16F is more precise')
+
+    plt.tight_layout()
+    plt.savefig('precision_curves.png', dpi=150)
+    print("\nChart saved as 'precision_curves.png'")
+
+if __name__ == "__main__":
+    main()
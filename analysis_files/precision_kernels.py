@@ -0,0 +1,220 @@
+import numpy as np
+
+from precision_curves import eye_space_crossovers
+
+# Selectable compute precision. Outputs are 16-bit formats, so float32 halves
+# memory traffic; validate_float32() checks that it does not change the answers.
+COMPUTE_DTYPES = {
+    "float32": np.float32,
+    "float64": np.float64,
+}
+
+def resolve_dtype(dtype):
+    if isinstance(dtype, str):
+        try:
+            return np.dtype(COMPUTE_DTYPES[dtype])
+        except KeyError:
+            raise ValueError(f"Unsupported compute dtype: {dtype}") from None
+    dtype = np.dtype(dtype)
+    if dtype.type not in COMPUTE_DTYPES.values():
+        raise ValueError(f"Unsupported compute dtype: {dtype}")
+    return dtype
+
+# Round-trip normalized depth through R16F storage (round to nearest even, like the GPU)
+def quantize_r16f(x):
+    x = np.asarray(x)
+    return x.astype(np.float16).astype(x.dtype)
+
+# Round-trip normalized depth through R16Unorm storage
+def quantize_r16unorm(x):
+    x = np.asarray(x)
+    return (np.round(np.clip(x, 0.0, 1.0) * 65535.0) / 65535.0).astype(x.dtype)
+
+# Supported depth storage formats
+DEPTH_FORMATS = {
+    "R16F": quantize_r16f,
+    "R16Unorm": quantize_r16unorm,
+}
+
+# Calculate precision step for R16F format over a whole array. frexp is exact in
+# any dtype, so the binade is never misjudged the way floor(log2(x)) can be in float32.
+def fp16_precision(x, dtype=np.float64):
+    x = np.asarray(x, dtype=resolve_dtype(dtype))
+    _, exponent = np.frexp(x)
+    exponent = np.maximum(exponent - 1, -14)  # Subnormals share the 2^-14 binade step
+    return np.where(x == 0, x.dtype.type(2.0**-24), np.ldexp(x.dtype.type(1.0), exponent - 10))
+
+# Calculate precision step for R16Unorm format over a whole array
+def unorm16_precision(x, dtype=np.float64):
+    x = np.asarray(x, dtype=resolve_dtype(dtype))
+    return np.full_like(x, 1 / 65535.0)
+
+# Calculate Linear Eye Z from perspective projection in the requested dtype
+def linear_eye_z(ndc_z, near, far, dtype=np.float64):
+    dtype = resolve_dtype(dtype)
+    ndc_z = np.asarray(ndc_z, dtype=dtype)
+    near, far = dtype.type(near), dtype.type(far)
+    # Assuming reversed-Z NDC in [0,1] range
+    # ndc_z is 0 at far plane and 1 at near plane
+    return near * far / (far * ndc_z + near * (dtype.type(1.0) - ndc_z))
+
+# NDC sweep and derived precision arrays for one far plane, all in one dtype.
+# Pass ndc_z_values to run the sweep on given NDC positions (cast to dtype).
+def precision_sweep(near, far, samples, dtype=np.float64, ndc_z_values=None):
+    dtype = resolve_dtype(dtype)
+    if ndc_z_values is None:
+        ndc_z_values = np.linspace(0.0, 1.0, samples, dtype=dtype)
+    ndc_z_values = np.asarray(ndc_z_values, dtype=dtype)
+    eye_z_values = linear_eye_z(ndc_z_values, near, far, dtype)
+    normalized_eye_z = eye_z_values / dtype.type(far)
+    fp16_prec = fp16_precision(normalized_eye_z, dtype)
+    unorm16_prec = unorm16_precision(normalized_eye_z, dtype)
+    return {
+        "ndc_z": ndc_z_values,
+        "eye_z": eye_z_values,
+        "normalized_eye_z": normalized_eye_z,
+        "precision_ratio": unorm16_prec / fp16_prec,
+    }
+
+# Eye space positions where the sampled precision ratio crosses 1.0
+def sampled_crossovers(sweep):
+    better = sweep["precision_ratio"] > 1
+    idx = np.flatnonzero(better[1:] != better[:-1]) + 1
+    return sweep["eye_z"][idx]
+
+# Eye space round-trip error for each format (stored as normalized_eye_z = eye_z / far),
+# computed in the dtype of eye_z
+def round_trip_errors(eye_z, far):
+    eye_z = np.asarray(eye_z)
+    far = eye_z.dtype.type(far)
+    normalized_eye_z = eye_z / far
+    return {name: np.abs(quantize(normalized_eye_z) * far - eye_z)
+            for name, quantize in DEPTH_FORMATS.items()}
+
+# Round-trip error statistics for each format, computed in the dtype of eye_z
+def round_trip_error_statistics(eye_z, far):
+    errors = round_trip_errors(eye_z, far)
+    stats = {}
+    for name, err in errors.items():
+        stats[f"{name} mean"] = float(np.mean(err))
+        stats[f"{name} p95"] = float(np.percentile(err, 95))
+        stats[f"{name} max"] = float(np.max(err))
+    stats["R16F win fraction"] = float(np.mean(errors["R16F"] < errors["R16Unorm"]))
+    return stats, errors
+
+# Merge flagged sample indices into contiguous eye space regions
+def _flagged_regions(mask, eye_z):
+    idx = np.flatnonzero(mask)
+    if idx.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(idx) > 1)
+    starts = np.r_[idx[0], idx[breaks + 1]]
+    ends = np.r_[idx[breaks], idx[-1]]
+    return [(float(min(eye_z[s], eye_z[e])), float(max(eye_z[s], eye_z[e])), int(e - s + 1))
+            for s, e in zip(starts, ends)]
+
+# Samples per far plane for validate_float32
+VALIDATION_SAMPLES = 1_000_000
+
+# Run the same NDC sweep (the float64 positions, cast to float32) in float32 and
+# float64 and flag every region where float32 arithmetic changes a crossover or a
+# per-sample win/loss result. Where both formats' errors lie within tie_ulps
+# float32 ulps of eye_z of each other, the win is a tie that float32 rounding may
+# resolve either way; those samples are counted separately and not flagged.
+def validate_float32(near, far, samples=VALIDATION_SAMPLES, stat_tolerance=1e-3, tie_ulps=2):
+    sweep64 = precision_sweep(near, far, samples, np.float64)
+    sweep32 = precision_sweep(near, far, samples, np.float32, sweep64["ndc_z"])
+
+    precision_flips = (sweep32["precision_ratio"] > 1) != (sweep64["precision_ratio"] > 1)
+    stats32, errors32 = round_trip_error_statistics(sweep64["eye_z"].astype(np.float32), far)
+    stats64, errors64 = round_trip_error_statistics(sweep64["eye_z"], far)
+    wins_changed = ((errors32["R16F"] < errors32["R16Unorm"])
+                    != (errors64["R16F"] < errors64["R16Unorm"]))
+    tie_width = tie_ulps * np.spacing(sweep64["eye_z"].astype(np.float32)).astype(np.float64)
+    ties = np.abs(errors64["R16F"] - errors64["R16Unorm"]) <= tie_width
+    round_trip_flips = wins_changed & ~ties
+
+    crossovers32 = sampled_crossovers(sweep32)
+    crossovers64 = sampled_crossovers(sweep64)
+    crossovers_match = (len(crossovers32) == len(crossovers64)
+                        and np.allclose(crossovers32, crossovers64, rtol=1e-6))
+
+    stat_deviations = {key: abs(stats32[key] - stats64[key]) / max(abs(stats64[key]), 1e-30)
+                       for key in stats64}
+    # Error statistics are in meters; a difference within tie_ulps float32 ulps of
+    # the far plane is float32 resolution, not a changed result
+    error_resolution = tie_ulps * float(np.spacing(np.float32(far)))
+    flagged_stats = {key: dev for key, dev in stat_deviations.items()
+                     if dev > stat_tolerance
+                     and (key == "R16F win fraction" or abs(stats32[key] - stats64[key]) > error_resolution)}
+
+    return {
+        "far": far,
+        "crossovers_float32": crossovers32,
+        "crossovers_float64": crossovers64,
+        "crossovers_exact": eye_space_crossovers(near, far),
+        "crossovers_match": crossovers_match,
+        "precision_flip_regions": _flagged_regions(precision_flips, sweep64["eye_z"]),
+        "round_trip_flip_regions": _flagged_regions(round_trip_flips, sweep64["eye_z"]),
+        "round_trip_flip_fraction": float(np.mean(round_trip_flips)),
+        "round_trip_tie_flips": int(np.count_nonzero(wins_changed & ties)),
+        "stat_deviations": stat_deviations,
+        "flagged_stats": flagged_stats,
+        "bytes_float32": sum(a.nbytes for a in sweep32.values()),
+        "bytes_float64": sum(a.nbytes for a in sweep64.values()),
+        "ok": (crossovers_match and not precision_flips.any() and not round_trip_flips.any()
+               and not flagged_stats),
+    }
+
+# Print the validation of float32 against float64 for each far plane; returns
+# True when no far plane is flagged. With verbose=False only the verdicts are printed.
+def print_float32_validation(near, far_values, samples=VALIDATION_SAMPLES, verbose=True):
+    print(f"Validating float32 compute mode against float64 ({samples} NDC samples per Far Plane)")
+    all_ok = True
+    for far in far_values:
+        report = validate_float32(near, far, samples)
+        all_ok = all_ok and report["ok"]
+        status = "OK" if report["ok"] else "FLAGGED"
+        if not verbose:
+            print(f"  Far={far:g}m: {status}")
+            continue
+        print(f"\nFor Far={far}m: {status}")
+        print(f"  Memory: {report['bytes_float32']} bytes (float32) vs "
+              f"{report['bytes_float64']} bytes (float64)")
+        print(f"  Crossovers (eye space): float32 "
+              f"{', '.join(f'{z:.4f}m' for z in report['crossovers_float32'])}, float64 "
+              f"{', '.join(f'{z:.4f}m' for z in report['crossovers_float64'])}, exact "
+              f"{', '.join(f'{z:.4f}m' for z in report['crossovers_exact'])}")
+
+        for start, end, count in report["precision_flip_regions"]:
+            print(f"  Precision win/loss changed by float32 in Eye Z {start:.4f}m - {end:.4f}m "
+                  f"({count} samples)")
+        regions = report["round_trip_flip_regions"]
+        if regions:
+            print(f"  Round-trip win/loss changed by float32 for "
+                  f"{100 * report['round_trip_flip_fraction']:.4f}% of samples in {len(regions)} regions, "
+                  f"largest: " + ', '.join(f'{s:.4f}m - {e:.4f}m ({n})' for s, e, n in
+                                            sorted(regions, key=lambda r: -r[2])[:3]))
+        if report["round_trip_tie_flips"]:
+            print(f"  Round-trip ties resolved differently by float32: "
+                  f"{report['round_trip_tie_flips']} samples (not flagged)")
+        for key, deviation in report["flagged_stats"].items():
+            print(f"  {key} differs by {100 * deviation:.3f}% between float32 and float64")
+    return all_ok
+
+# Validation run by float32 analyses before their results are used: prints the
+# per far plane verdicts in float32 mode and does nothing in float64 mode
+def check_compute_dtype(near, dtype, *far_values):
+    if resolve_dtype(dtype) != np.float32:
+        return True
+    return print_float32_validation(near, far_values, verbose=False)
+
+def main():
+    from analysis_params import parse_args
+
+    # Near and far planes come from analysis_params.json
+    params = parse_args('Validate float32 compute mode against float64', check_dtype=False)
+    print_float32_validation(params["near"], params["far_values"])
+
+if __name__ == "__main__":
+    main()